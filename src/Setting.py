@@ -4,24 +4,55 @@ from model import ModelType
 BINARY_LOCATION = "/usr/bin/google-chrome"
 CHROMEDRIVER_LOCATION = "/usr/local/bin/chromedriver"
 MODEL_LOCATION = "data"
+USE_EMBEDDING_STORE = True  # open the mmap store written by `pipenv run convert` if it exists
+USE_VOCABULARY_PACK = True  # use the pack written by `pipenv run vocab` and load the model lazily
 TESTCASE_DIR = "experiment"
 TESTCASE_FILE = "mantisbt_all"
 ALL_TESTCASE = False # Run all test case
 TESTCASES = ["create_custom_fields"] # test case set to run if ALL_TESTCASE==false
 OUTPUT_DIRECTORY = "test_script"
+PAGE_DIRECTORY = "pages"  # page sources saved for `pipenv run vocab`
+SNAPSHOT_DIRECTORY = "snapshots"  # extracted pages saved with USE_SNAPSHOT
 WRITE_LOCATOR = False
 
 # Common
 MODEL = ModelType.FASTTEXT_300 
 HEADLESS = False  # Chrome headless
+SMART_WAIT = True  # wait until the page is ready instead of SLEEP_TIME/TRANSITION_SLEEP_TIME
 SLEEP_TIME = 0  # wait between operations
 TRANSITION_SLEEP_TIME = 0  # wait after page transition
+PAGE_READY_TIMEOUT = 10  # max wait for a page to become ready [sec]
+ELEMENT_TIMEOUT = 5  # max wait for an element to be present [sec]
+PROBE_TIMEOUT = 0.5  # max wait for an element of a candidate while searching [sec]
+NAVIGATION_TIMEOUT = 1  # max wait for a click to replace the document [sec]
+DOM_QUIET_TIME = 0.2  # the page is ready when its DOM has not changed for this long [sec]
 SHOW_OPERATION = False
+TESTCASE_PROCESSES = 1  # test cases generated in parallel processes
+EXTRACT_IN_BROWSER = True  # extract the elements with one script instead of parsing the page source
+HTML_PARSER = "lxml"  # "lxml" or "html.parser" (BeautifulSoup) for the page source
+SKIP_UNRENDERED = False  # drop the elements the browser does not render, EXTRACT_IN_BROWSER only
+SAVE_PAGE = False  # save every page source into PAGE_DIRECTORY
 IDF_WEIGHT = 1.5  # The closer to 1, the bigger
 TAG_CLICK = {"button", "img", "a"}  # click target tags
 
 # Transition-level search
 RESTART_DRIVER = True
+DRIVER_POOL_SIZE = 2  # warm browsers reused on restart, 0 to launch a new one every time
+DRIVER_RECYCLE_NAVIGATIONS = 300  # relaunch a pooled browser after this many navigations
+DRIVER_RECYCLE_MEMORY = 512  # relaunch a pooled browser whose JS heap exceeds this [MB]
+BEAM_WORKERS = 1  # browsers expanding the beam in parallel, bounded by cores and memory
+BROWSER_MEMORY = 500  # memory to reserve per browser when bounding BEAM_WORKERS [MB]
+USE_SNAPSHOT = False  # reuse the pages extracted at the same action path, also in later runs
+USE_CHECKPOINT = True  # restore the previous page from a checkpoint instead of replaying from open
+PAGE_CACHE_SIZE = 32  # pages scored once per run by their fingerprint, 0 to disable
+GROUP_TRANSITIONS = True  # observe the next page once per sequence of clicked locators
+MERGE_STATES = True  # keep only the best candidate of those that reached the same page
+STRATEGY = "beam"  # "beam", "best_first" or "greedy"
+BEST_FIRST_BOUND = 1.0  # optimistic score per operation type until a page with it is observed
+BEST_FIRST_EXPANSIONS = 25  # pages observed by best_first before it completes greedily
+GREEDY_BACKTRACKS = 10  # wrong-looking pages until greedy stops backtracking, keeping the last
+GREEDY_MIN_SCORE = 0.5  # best similarity per operation type below which a page looks wrong
+BEAM_FILL_LIMIT = 10  # candidates reached at most per depth to fill the beam with distinct pages
 SEARCH_WIDTH = 5
 BEAM_WIDTH = 5
 PAGE_MATCHING_SEARCH = 10  # explore top n
@@ -2,12 +2,13 @@ from collections import defaultdict
 from math import log
 from typing import List
 
-from numpy import average, dot
+from numpy import add, cumsum, vstack, where, zeros
 from numpy.linalg import norm
 
 import Setting
-from model import Model, ModelType
+from model import Model
 from page.element import Element
+from page.page_table import PageTable
 
 
 class IdfCalculator:
@@ -28,54 +29,58 @@ class IdfCalculator:
 
 
 class VectorCalculator:
+    # element and query vectors are L2-normalized, so a cosine similarity is a dot product
     def __init__(self, model: Model, idf):
         self.__model = model
         self.__idf = idf
+        self.__query_vectors = {}
 
-    def get_elem_vector(self, elem: Element):
-        return self.__get_words_vector_weighted(elem.attr_words)
+    def get_elem_vectors(self, elems: List[Element]):
+        return self.__get_words_vectors_weighted([elem.attr_words for elem in elems])
 
-    def get_text_vector(self, elem: Element):
-        if len(elem.text_words) != 0:
-            return self.__get_words_vector_weighted(elem.text_words)
-        else:
-            return None
+    def get_text_vectors(self, elems: List[Element]):
+        # zero rows for the elements without text
+        vectors = zeros((len(elems), self.__model.get_dimension()))
+        with_text = [i for i, elem in enumerate(elems) if len(elem.text_words) != 0]
+        vectors[with_text] = self.__get_words_vectors_weighted(
+            [elems[i].text_words for i in with_text]
+        )
+        return vectors
 
-    def get_similarity(self, query, elem: Element) -> float:
-        query_vector = self.__get_words_vector(query)
-        cos_sim_words = self.__cosine_similarity(query_vector, elem.attr_vector)
-        if len(elem.text_words) != 0:
-            cos_sim_text = self.__cosine_similarity(query_vector, elem.text_vector)
-            return (cos_sim_words + Setting.TEXT_WEIGHT * cos_sim_text) / (1 + Setting.TEXT_WEIGHT)
-        else:
-            return cos_sim_words
+    def get_query_vector(self, query):
+        key = tuple(query)
+        if key not in self.__query_vectors:
+            self.__query_vectors[key] = self.__normalize(self.__get_words_vector(query))
+        return self.__query_vectors[key]
 
-    def __get_words_vector_weighted(self, words):
-        vector = []
-        weights = []
-        for word in words:
-            if (
-                Setting.MODEL not in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]
-                and word not in self.__model.vocab
-            ):
-                vector.append([0.5] * self.__model.get_dimension())
-            else:
-                vector.append(self.__model.get_vector(word))
-            weights.append(self.__idf[word])
+    def get_similarity_matrix(self, queries: List[List[str]], table: PageTable, indexes):
+        # (queries x rows of indexes) cosine similarities, averaged with the text one if any
+        if len(queries) == 0 or len(indexes) == 0:
+            return zeros((len(queries), len(indexes)))
+        query_vectors = vstack([self.get_query_vector(query) for query in queries])
+        cos_sim_words = query_vectors @ table.attr_vectors[indexes].T
+        cos_sim_text = query_vectors @ table.text_vectors[indexes].T
+        return where(
+            table.has_text[indexes],
+            (cos_sim_words + Setting.TEXT_WEIGHT * cos_sim_text) / (1 + Setting.TEXT_WEIGHT),
+            cos_sim_words,
+        )
 
-        return average(vector, axis=0, weights=weights)
+    def __get_words_vectors_weighted(self, words_list: List[List[str]]):
+        # weighted average of every (non-empty) word list with one lookup and one reduceat
+        if len(words_list) == 0:
+            return zeros((0, self.__model.get_dimension()))
+        words = [word for words in words_list for word in words]
+        weights = [[self.__idf[word]] for word in words]
+        offsets = cumsum([0] + [len(words) for words in words_list[:-1]])
+        sums = add.reduceat(self.__model.get_vectors(words) * weights, offsets)
+        weight_sums = add.reduceat(weights, offsets)
+        if (weight_sums == 0).any():
+            raise ZeroDivisionError("Weights sum to zero, can't be normalized")
+        return self.__normalize(sums / weight_sums)
 
     def __get_words_vector(self, words):
-        vector = []
-        for word in words:
-            if (
-                Setting.MODEL not in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]
-                and word not in self.__model.vocab
-            ):
-                vector.append([0.5] * self.__model.get_dimension())
-            else:
-                vector.append(self.__model.get_vector(word))
-        return average(vector, axis=0)
+        return self.__model.get_vectors(words).mean(axis=0)
 
-    def __cosine_similarity(self, a, b):
-        return dot(a, b) / (norm(a) * norm(b))
+    def __normalize(self, vectors):
+        return vectors / norm(vectors, axis=-1, keepdims=True)
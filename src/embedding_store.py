@@ -0,0 +1,153 @@
+import json
+import os
+from typing import List
+
+import numpy
+
+try:
+    from gensim.models.fasttext import ft_ngram_hashes
+except ImportError:  # gensim < 4.0
+    from gensim.models.utils_any2vec import ft_ngram_hashes
+
+
+class EmbeddingStore:
+    # word vectors converted to .npy files and opened with mmap, read-only
+    SUFFIX = ".store"
+    __META = "meta.json"
+    __VECTORS = "vectors.npy"
+    __KEYS = "keys.npy"
+    __INDEX = "index.npy"
+    __NGRAMS = "ngrams.npy"
+    __MISSING = "missing.npy"
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, self.__META)) as f:
+            meta = json.load(f)
+        self.__vector_size = meta["vector_size"]
+        self.__min_n = meta["min_n"]
+        self.__max_n = meta["max_n"]
+        self.__bucket = meta["bucket"]
+        self.__vectors = numpy.load(os.path.join(directory, self.__VECTORS), mmap_mode="r")
+        self.__keys = numpy.load(os.path.join(directory, self.__KEYS), mmap_mode="r")
+        self.__index = numpy.load(os.path.join(directory, self.__INDEX), mmap_mode="r")
+        if self.__bucket > 0:
+            self.__ngrams = numpy.load(os.path.join(directory, self.__NGRAMS), mmap_mode="r")
+        else:
+            self.__ngrams = None
+        missing_path = os.path.join(directory, self.__MISSING)
+        if os.path.isfile(missing_path):
+            self.__missing = numpy.load(missing_path)
+        else:
+            self.__missing = numpy.array([], dtype="S1")
+
+    @property
+    def vector_size(self):
+        return self.__vector_size
+
+    def __contains__(self, word) -> bool:
+        return self.__lookup(word) is not None
+
+    def __getitem__(self, word):
+        index = self.__lookup(word)
+        if index is not None:
+            return numpy.array(self.__vectors[index])
+        if self.__ngrams is None:
+            raise KeyError("word '{}' not in vocabulary".format(word))
+        # same as FastTextKeyedVectors: average of the char n-gram buckets
+        hashes = ft_ngram_hashes(word, self.__min_n, self.__max_n, self.__bucket)
+        if len(hashes) == 0:
+            return numpy.zeros(self.__vector_size, dtype=numpy.float32)
+        return numpy.array(self.__ngrams[hashes]).mean(axis=0)
+
+    def get_indexes(self, words: List[str]):
+        # rows of the words in vectors, -1 for the words out of vocabulary
+        encoded = [word.encode("utf-8") for word in words]
+        if len(encoded) == 0 or len(self.__keys) == 0:
+            return numpy.full(len(encoded), -1, dtype=numpy.int64)
+        query = numpy.array(encoded, dtype=self.__keys.dtype)
+        positions = numpy.searchsorted(self.__keys, query)
+        positions = numpy.minimum(positions, len(self.__keys) - 1)
+        found = self.__keys[positions] == query
+        found &= numpy.array([len(key) <= self.__keys.itemsize for key in encoded])
+        return numpy.where(found, self.__index[positions], -1)
+
+    def get_missing(self, words: List[str]):
+        # mask of the words known to be out of the vocabulary of the model the store was built from
+        encoded = [word.encode("utf-8") for word in words]
+        if len(encoded) == 0 or len(self.__missing) == 0:
+            return numpy.zeros(len(encoded), dtype=bool)
+        query = numpy.array(encoded, dtype=self.__missing.dtype)
+        positions = numpy.searchsorted(self.__missing, query)
+        positions = numpy.minimum(positions, len(self.__missing) - 1)
+        found = self.__missing[positions] == query
+        found &= numpy.array([len(key) <= self.__missing.itemsize for key in encoded])
+        return found
+
+    def get_rows(self, indexes):
+        return numpy.asarray(self.__vectors[indexes], dtype=numpy.float32)
+
+    def __lookup(self, word):
+        key = word.encode("utf-8")
+        if len(key) > self.__keys.itemsize:
+            return None
+        position = numpy.searchsorted(self.__keys, key)
+        if position < len(self.__keys) and self.__keys[position] == key:
+            return self.__index[position]
+        return None
+
+    @classmethod
+    def get_path(cls, model_path: str) -> str:
+        return model_path + cls.SUFFIX
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.isfile(os.path.join(directory, cls.__META))
+
+    @classmethod
+    def convert(cls, keyed_vectors, directory: str):
+        words = getattr(keyed_vectors, "index_to_key", None)
+        if words is None:  # gensim < 4.0
+            words = keyed_vectors.index2word
+        if hasattr(keyed_vectors, "vectors_ngrams"):
+            cls.write(
+                directory,
+                words,
+                keyed_vectors.vectors,
+                keyed_vectors.vectors_ngrams,
+                keyed_vectors.min_n,
+                keyed_vectors.max_n,
+            )
+        else:
+            cls.write(directory, words, keyed_vectors.vectors)
+
+    @classmethod
+    def write(cls, directory: str, words, vectors, ngrams=None, min_n=0, max_n=0, missing=()):
+        os.makedirs(directory, exist_ok=True)
+        vectors = numpy.asarray(vectors, dtype=numpy.float32)
+        numpy.save(os.path.join(directory, cls.__VECTORS), vectors)
+        # sorted keys are searched with binary search, so the index is never loaded into a dict
+        keys = numpy.array([word.encode("utf-8") for word in words])
+        order = numpy.argsort(keys, kind="stable")
+        numpy.save(os.path.join(directory, cls.__KEYS), keys[order])
+        numpy.save(os.path.join(directory, cls.__INDEX), order.astype(numpy.int64))
+        if len(missing) > 0:
+            numpy.save(
+                os.path.join(directory, cls.__MISSING),
+                numpy.sort(numpy.array([word.encode("utf-8") for word in missing])),
+            )
+        elif os.path.isfile(os.path.join(directory, cls.__MISSING)):
+            os.remove(os.path.join(directory, cls.__MISSING))
+        bucket = 0
+        if ngrams is not None:
+            bucket = len(ngrams)
+            numpy.save(
+                os.path.join(directory, cls.__NGRAMS), numpy.asarray(ngrams, dtype=numpy.float32)
+            )
+        meta = {
+            "vector_size": vectors.shape[1],
+            "min_n": min_n,
+            "max_n": max_n,
+            "bucket": bucket,
+        }
+        with open(os.path.join(directory, cls.__META), mode="w") as f:
+            json.dump(meta, f)
@@ -0,0 +1,66 @@
+import sys
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+from typing import List, Optional, Tuple
+
+import Setting
+from model import Model
+from page.driver_pool import DriverPool
+from script.operation import LocatableOperation
+from script.script_writer import LocatorWriter
+from script.strategy.strategy_factory import StrategyFactory
+from script.test_case import TestCase
+from util.memory_util import MemoryUtil
+
+
+class GenerationWorker:
+    # generates test cases in a process pool. The model is loaded before the workers are forked
+    # (or opened again with mmap when they are spawned), so its vectors are not copied per worker.
+    # A full model loaded lazily on a miss of the vocabulary pack is loaded by each worker on its
+    # own, and shared between them only through the page cache when it is an EmbeddingStore
+    __model: Optional[Model] = None
+    __driver_pool: Optional[DriverPool] = None
+
+    @classmethod
+    def run(cls, model: Model, test_cases: List[TestCase], processes: int) -> List[Tuple[str, str]]:
+        # (method string, locators) of every test case, in the original order
+        cls.__model = model
+        with Pool(processes, initializer=cls.initialize) as pool:
+            results = {}
+            # longest first, so that a long test case does not start last
+            for i in sorted(range(len(test_cases)), key=lambda i: -cls.__cost(test_cases[i])):
+                results[i] = pool.apply_async(cls.generate, (test_cases[i],))
+            method_strings = [results[i].get() for i in range(len(test_cases))]
+            # leaving the block terminates the workers, their driver pools have to close first
+            pool.close()
+            pool.join()
+            return method_strings
+
+    @classmethod
+    def initialize(cls):
+        if cls.__model is None:
+            cls.__model = Model(Setting.MODEL)
+        if Setting.DRIVER_POOL_SIZE > 0:
+            cls.__driver_pool = DriverPool(Setting.DRIVER_POOL_SIZE)
+            Finalize(cls.__driver_pool, cls.__driver_pool.close, exitpriority=10)
+
+    @classmethod
+    def generate(cls, test_case: TestCase) -> Tuple[str, str]:
+        print("--------------------")
+        print(test_case.name)
+        print("--------------------")
+        MemoryUtil.reset_peak_rss()
+        strategy = StrategyFactory.create(cls.__model, cls.__driver_pool)
+        try:
+            method_string = strategy.to_code(test_case)
+            print("peak RSS: {}[MB]".format(MemoryUtil.get_peak_rss()))
+        except SystemExit:
+            raise RuntimeError("generation of {} failed".format(test_case.name))
+        finally:
+            sys.stdout.flush()
+        LocatorWriter.end_testcase()
+        return method_string, LocatorWriter.flush()
+
+    @classmethod
+    def __cost(cls, test_case: TestCase) -> int:
+        return sum(isinstance(step, LocatableOperation) for step in test_case.steps)
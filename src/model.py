@@ -1,8 +1,12 @@
 from enum import Enum
+from threading import Lock
+from typing import List
 
 import gensim
+import numpy
 
 import Setting
+from embedding_store import EmbeddingStore
 
 
 class ModelType(Enum):
@@ -15,24 +19,96 @@ class ModelType(Enum):
 
 
 class Model:
-    def __init__(self, model_type: ModelType):
-        filePath = Setting.MODEL_LOCATION + "/" + model_type.value
-        if model_type in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]:
-            self.__model = gensim.models.fasttext.load_facebook_vectors(filePath)
+    def __init__(self, model_type: ModelType, use_pack: bool = True):
+        self.__model_type = model_type
+        self.__model = None
+        self.__vocab = None
+        self.__pack = None
+        self.__lock = Lock()
+        pack_path = self.get_pack_path(model_type)
+        if use_pack and Setting.USE_VOCABULARY_PACK and EmbeddingStore.exists(pack_path):
+            # the full model is loaded only when a word is missing from the pack
+            self.__pack = EmbeddingStore(pack_path)
         else:
-            self.__model = gensim.models.KeyedVectors.load_word2vec_format(filePath, binary=True)
-        self.__vocab = self.__model.wv
+            self.__load()
 
     @property
     def model(self):
+        with self.__lock:  # shared by the beam workers
+            if self.__model is None:
+                print("loading full model...")
+                self.__load()
         return self.__model
 
     @property
     def vocab(self):
+        if self.__vocab is None:
+            self.model
         return self.__vocab
 
     def get_dimension(self):
-        return self.__model.vector_size
+        if self.__pack is not None:
+            return self.__pack.vector_size
+        return self.model.vector_size
+
+    def has_word(self, word) -> bool:
+        if self.__pack is not None:
+            if word in self.__pack:
+                return True
+            if self.__pack.get_missing([word])[0]:
+                return False
+        return word in self.vocab
 
     def get_vector(self, word):
-        return self.__model[word]
+        if self.__pack is not None and word in self.__pack:
+            return self.__pack[word]
+        return self.model[word]
+
+    def get_vectors(self, words: List[str]):
+        vectors = numpy.empty((len(words), self.get_dimension()), dtype=numpy.float32)
+        missing = numpy.arange(len(words))
+        if self.__pack is not None:
+            missing = self.__fill(self.__pack, words, missing, vectors)
+            # out of vocabulary when the pack was built, answered without the full model
+            oov = self.__pack.get_missing([words[i] for i in missing])
+            vectors[missing[oov]] = 0.5
+            missing = missing[~oov]
+        if len(missing) > 0 and isinstance(self.model, EmbeddingStore):
+            missing = self.__fill(self.model, words, missing, vectors)
+        for i in missing:
+            if self.__has_subwords() or words[i] in self.vocab:
+                vectors[i] = self.model[words[i]]
+            else:
+                vectors[i] = 0.5
+        return vectors
+
+    def __fill(self, store: EmbeddingStore, words: List[str], targets, vectors):
+        indexes = store.get_indexes([words[i] for i in targets])
+        found = indexes >= 0
+        vectors[targets[found]] = store.get_rows(indexes[found])
+        return targets[~found]
+
+    def __has_subwords(self) -> bool:
+        return self.__model_type in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]
+
+    def __load(self):
+        filePath = Setting.MODEL_LOCATION + "/" + self.__model_type.value
+        store_path = EmbeddingStore.get_path(filePath)
+        if Setting.USE_EMBEDDING_STORE and EmbeddingStore.exists(store_path):
+            self.__model = EmbeddingStore(store_path)
+            self.__vocab = self.__model
+        else:
+            self.__model = self.load_keyed_vectors(self.__model_type)
+            self.__vocab = self.__model.wv
+
+    @staticmethod
+    def load_keyed_vectors(model_type: ModelType):
+        filePath = Setting.MODEL_LOCATION + "/" + model_type.value
+        if model_type in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]:
+            return gensim.models.fasttext.load_facebook_vectors(filePath)
+        else:
+            return gensim.models.KeyedVectors.load_word2vec_format(filePath, binary=True)
+
+    @staticmethod
+    def get_pack_path(model_type: ModelType) -> str:
+        return "{}/{}.{}.pack".format(Setting.MODEL_LOCATION, model_type.value, Setting.TESTCASE_FILE)
@@ -0,0 +1,21 @@
+import traceback
+from time import time
+
+import Setting
+from embedding_store import EmbeddingStore
+from model import Model
+
+start = time()
+try:
+    print("loading model...")
+    keyed_vectors = Model.load_keyed_vectors(Setting.MODEL)
+    print("model load time:{0}".format(time() - start) + "[sec]")
+    directory = EmbeddingStore.get_path(Setting.MODEL_LOCATION + "/" + Setting.MODEL.value)
+    print("converting to {}".format(directory))
+    EmbeddingStore.convert(keyed_vectors, directory)
+except Exception as e:
+    print(e)
+    traceback.print_exc()
+finally:
+    elapsed_time = time() - start
+    print("elapsed_time:{0}".format(elapsed_time) + "[sec]")
@@ -1,26 +1,297 @@
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
 import Setting
 from script.locator import Locator, LocatorType
 from selenium import webdriver
 from selenium.common.exceptions import (NoAlertPresentException,
-                                        UnexpectedAlertPresentException)
+                                        UnexpectedAlertPresentException,
+                                        WebDriverException)
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
 from selenium.webdriver.support.select import Select
+from selenium.webdriver.support.wait import WebDriverWait
+
+# counts pending fetch/XHR and remembers the last DOM mutation of the document
+READY_SCRIPT = """
+(function() {
+    if (window.__pageReady) return;
+    var state = window.__pageReady = {pending: 0, lastMutation: Date.now()};
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.pending++;
+        this.addEventListener("loadend", function() { state.pending--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function() {
+            state.pending++;
+            return fetch.apply(this, arguments).finally(function() { state.pending--; });
+        };
+    }
+    new MutationObserver(function() { state.lastMutation = Date.now(); }).observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+})();
+"""
+
+# candidate elements of the page and the texts of the labels, as JSON.
+# xpath is positional like HtmlParser.get_xpath, text leaves out scripts and styles like bs4
+EXTRACT_SCRIPT = """
+var tags = arguments[0].join(",");
+var exceptAttrs = {};
+arguments[1].forEach(function(attr) { exceptAttrs[attr] = true; });
+var steps = new Map();
+var getStep = function(elem) {
+    var parent = elem.parentNode;
+    if (!steps.has(parent)) {
+        var counts = {};
+        var child;
+        for (child = parent.firstElementChild; child; child = child.nextElementSibling) {
+            counts[child.localName] = (counts[child.localName] || 0) + 1;
+        }
+        var indexes = {};
+        var map = new Map();
+        for (child = parent.firstElementChild; child; child = child.nextElementSibling) {
+            var name = child.localName;
+            indexes[name] = (indexes[name] || 0) + 1;
+            map.set(child, counts[name] === 1 ? name : name + "[" + indexes[name] + "]");
+        }
+        steps.set(parent, map);
+    }
+    return steps.get(parent).get(elem);
+};
+var skipped = {script: true, style: true, template: true};
+var getText = function(node) {
+    if (node.nodeType === Node.TEXT_NODE) return node.nodeValue;
+    if (node.nodeType !== Node.ELEMENT_NODE || skipped[node.localName]) return "";
+    var text = "";
+    for (var i = 0; i < node.childNodes.length; i++) text += getText(node.childNodes[i]);
+    return text;
+};
+var xpaths = new Map();
+var getXpath = function(elem) {
+    if (!xpaths.has(elem)) {
+        var parent = elem.parentNode;
+        var prefix = parent.nodeType === Node.ELEMENT_NODE ? getXpath(parent) : "";
+        xpaths.set(elem, prefix + "/" + getStep(elem));
+    }
+    return xpaths.get(elem);
+};
+var elements = Array.prototype.map.call(document.querySelectorAll(tags), function(elem) {
+    var attrs = {};
+    for (var i = 0; i < elem.attributes.length; i++) {
+        var attr = elem.attributes[i];
+        if (!exceptAttrs[attr.name]) attrs[attr.name] = attr.value;
+    }
+    return {
+        name: elem.localName,
+        attrs: attrs,
+        text: getText(elem),
+        xpath: getXpath(elem),
+        visible: !!(elem.offsetWidth || elem.offsetHeight || elem.getClientRects().length)
+    };
+});
+var labels = {};
+Array.prototype.forEach.call(document.getElementsByTagName("label"), function(label) {
+    var target = label.getAttribute("for");
+    if (target === null) return;
+    if (!Object.prototype.hasOwnProperty.call(labels, target)) labels[target] = [];
+    labels[target].push(getText(label));
+});
+return JSON.stringify({elements: elements, labels: labels});
+"""
+
+
+class Checkpoint:
+    # browser state needed to come back to a page without replaying the steps to it
+    def __init__(
+        self,
+        url: str,
+        title: str,
+        cookies: List[Dict],
+        local_storage: Dict[str, str],
+        session_storage: Dict[str, str],
+    ):
+        self.__url = url
+        self.__title = title
+        self.__cookies = cookies
+        self.__local_storage = local_storage
+        self.__session_storage = session_storage
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def title(self) -> str:
+        return self.__title
+
+    @property
+    def cookies(self) -> List[Dict]:
+        return self.__cookies
+
+    @property
+    def local_storage(self) -> Dict[str, str]:
+        return self.__local_storage
+
+    @property
+    def session_storage(self) -> Dict[str, str]:
+        return self.__session_storage
 
 
 class DriverManager:
-    def __init__(self):
+    __POLL_INTERVAL = 0.05  # [sec]
+
+    def __init__(self, service_url: Optional[str] = None):
         options = Options()
         options.binary_location = Setting.BINARY_LOCATION
         options.add_experimental_option("prefs", {"intl.accept_languages": "en_US"})
         options.add_argument("--no-sandbox")
         if Setting.HEADLESS:
             options.add_argument("--headless")
-        self.__driver = webdriver.Chrome(Setting.CHROMEDRIVER_LOCATION, chrome_options=options)
+        if service_url is None:
+            self.__driver = webdriver.Chrome(Setting.CHROMEDRIVER_LOCATION, chrome_options=options)
+        else:
+            # connect to a chromedriver that is already running (see DriverPool)
+            self.__driver = webdriver.Remote(
+                command_executor=ChromeRemoteConnection(service_url),
+                desired_capabilities=options.to_capabilities(),
+            )
+        self.__navigation_count = 0
+        self.__restored = False
+        self.__element_timeout = Setting.ELEMENT_TIMEOUT
+        # the document an action was executed on, marked so that its replacement is noticed
+        self.__marked = False
+        self.__wait_log: List[Tuple[str, float]] = []
+        if Setting.SMART_WAIT:
+            try:
+                # instrument every document before its own scripts run
+                self.__driver.execute(
+                    "executeCdpCommand",
+                    {
+                        "cmd": "Page.addScriptToEvaluateOnNewDocument",
+                        "params": {"source": READY_SCRIPT},
+                    },
+                )
+            except WebDriverException:
+                pass  # injected on the first wait instead
+
+    @property
+    def navigation_count(self) -> int:
+        return self.__navigation_count
+
+    @property
+    def element_timeout(self) -> float:
+        return self.__element_timeout
+
+    @element_timeout.setter
+    def element_timeout(self, element_timeout: float):
+        self.__element_timeout = element_timeout
+
+    @property
+    def restored(self) -> bool:
+        # the session of a checkpoint was loaded since the browser was launched or cleared
+        return self.__restored
+
+    @property
+    def wait_log(self) -> List[Tuple[str, float]]:
+        # (action, seconds) of every wait
+        return self.__wait_log
+
+    @property
+    def wait_time(self) -> float:
+        return sum(seconds for _, seconds in self.__wait_log)
 
     def quit(self):
         self.__driver.quit()
 
+    def reset(self):
+        # forget the session of the application so that the browser can be handed out again
+        self.clear_session()
+        self.__element_timeout = Setting.ELEMENT_TIMEOUT
+        self.__wait_log = []
+
+    def clear_session(self):
+        self.__driver.delete_all_cookies()
+        self.__driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        self.__driver.get("about:blank")
+        self.__restored = False
+
+    def get_memory_usage(self) -> int:
+        # JS heap of the current page in bytes
+        return self.__driver.execute_script(
+            "return window.performance.memory ? window.performance.memory.usedJSHeapSize : 0;"
+        )
+
+    def checkpoint(self) -> Optional[Checkpoint]:
+        try:
+            return self.__checkpoint()
+        except WebDriverException:
+            return None
+
+    def __checkpoint(self) -> Checkpoint:
+        local_storage, session_storage = self.__driver.execute_script(
+            """
+            var dump = function(storage) {
+                var items = {};
+                for (var i = 0; i < storage.length; i++) {
+                    items[storage.key(i)] = storage.getItem(storage.key(i));
+                }
+                return items;
+            };
+            return [dump(window.localStorage), dump(window.sessionStorage)];
+            """
+        )
+        return Checkpoint(
+            self.__driver.current_url,
+            self.__driver.title,
+            self.__driver.get_cookies(),
+            local_storage,
+            session_storage,
+        )
+
+    def restore(self, checkpoint: Checkpoint) -> bool:
+        # False if the page cannot be reached again from the checkpoint (e.g. result of a POST).
+        # the session is cleared then, so that the caller does not go on with half of it
+        try:
+            self.__restored = True
+            self.open(checkpoint.url)
+            self.__driver.delete_all_cookies()
+            for cookie in checkpoint.cookies:
+                cookie = dict(cookie)
+                if "expiry" in cookie:
+                    cookie["expiry"] = int(cookie["expiry"])
+                self.__driver.add_cookie(cookie)
+            self.__driver.execute_script(
+                """
+                window.localStorage.clear();
+                window.sessionStorage.clear();
+                for (var key in arguments[0]) window.localStorage.setItem(key, arguments[0][key]);
+                for (var key in arguments[1]) window.sessionStorage.setItem(key, arguments[1][key]);
+                """,
+                checkpoint.local_storage,
+                checkpoint.session_storage,
+            )
+            self.open(checkpoint.url)
+            self.wait_for_page()
+            if (
+                self.__driver.current_url == checkpoint.url
+                and self.__driver.title == checkpoint.title
+            ):
+                return True
+        except WebDriverException:
+            pass
+        try:
+            self.clear_session()
+        except WebDriverException:
+            pass
+        return False
+
     def open(self, url):
+        self.__navigation_count += 1
         try:
             self.__driver.get(url)
         except UnexpectedAlertPresentException:
@@ -32,6 +303,72 @@ class DriverManager:
             except NoAlertPresentException:
                 pass
 
+    def wait_for_page(self):
+        # after a page transition
+        if Setting.SMART_WAIT:
+            if self.__marked:
+                self.__wait_for_navigation()
+            self.wait_until_ready()
+        else:
+            time.sleep(Setting.TRANSITION_SLEEP_TIME)
+
+    def wait_for_operation(self):
+        # before an operation, with SMART_WAIT the element itself is waited for in __locate
+        if not Setting.SMART_WAIT:
+            time.sleep(Setting.SLEEP_TIME)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        # document loaded, no pending fetch/XHR and no DOM mutation for DOM_QUIET_TIME.
+        # False on timeout
+        if timeout is None:
+            timeout = Setting.PAGE_READY_TIMEOUT
+        start = time.time()
+        ready = False
+        while True:
+            try:
+                state = self.__driver.execute_script(
+                    """
+                    var state = window.__pageReady;
+                    return [
+                        document.readyState,
+                        state ? state.pending : -1,
+                        state ? Date.now() - state.lastMutation : -1
+                    ];
+                    """
+                )
+            except WebDriverException:
+                break  # alert or closed window, the next action handles it
+            ready_state, pending, quiet = state
+            if pending < 0:
+                if ready_state == "complete":
+                    self.__driver.execute_script(READY_SCRIPT)
+            elif ready_state == "complete" and pending == 0:
+                if quiet >= Setting.DOM_QUIET_TIME * 1000:
+                    ready = True
+                    break
+            if time.time() - start >= timeout:
+                break
+            time.sleep(self.__POLL_INTERVAL)
+        self.__wait_log.append(("page", time.time() - start))
+        return ready
+
+    def __wait_for_navigation(self) -> bool:
+        # the old document can look ready right after a click, before the navigation starts.
+        # False on timeout, e.g. when the click does not navigate
+        self.__marked = False
+        start = time.time()
+        navigated = False
+        while True:
+            try:
+                navigated = self.__driver.execute_script("return !document.__beforeAction;")
+            except WebDriverException:
+                pass  # alert or unloading document
+            if navigated or time.time() - start >= Setting.NAVIGATION_TIMEOUT:
+                break
+            time.sleep(self.__POLL_INTERVAL)
+        self.__wait_log.append(("navigation", time.time() - start))
+        return navigated
+
     def enter(self, locator: Locator, value: str):
         element = self.__locate(locator)
         element.clear()
@@ -43,7 +380,14 @@ class DriverManager:
 
     def click(self, locator: Locator):
         element = self.__locate(locator)
-        element.click()
+        self.__navigation_count += 1
+        if Setting.SMART_WAIT:
+            self.__mark_document()
+        try:
+            element.click()
+        except Exception:
+            self.__marked = False
+            raise
 
     def get_page_source(self) -> str:
         try:
@@ -57,7 +401,39 @@ class DriverManager:
             except NoAlertPresentException:
                 return ""
 
+    def extract_elements(self, tags: Iterable[str], except_attrs: Iterable[str]) -> Dict:
+        # {"elements": [{name, attrs, text, xpath, visible}], "labels": {for: [text]}}
+        args = [sorted(tags), sorted(except_attrs)]
+        try:
+            return json.loads(self.__driver.execute_script(EXTRACT_SCRIPT, *args))
+        except UnexpectedAlertPresentException:
+            try:
+                alert = self.__driver.switch_to_alert()
+                alert.accept()
+                print("Alert accepted")
+                return json.loads(self.__driver.execute_script(EXTRACT_SCRIPT, *args))
+            except NoAlertPresentException:
+                return {"elements": [], "labels": {}}
+
+    def __mark_document(self):
+        try:
+            self.__driver.execute_script("document.__beforeAction = true;")
+            self.__marked = True
+        except WebDriverException:
+            self.__marked = False
+
     def __locate(self, locator: Locator):
+        if not Setting.SMART_WAIT:
+            return self.__find(locator)
+        start = time.time()
+        try:
+            return WebDriverWait(
+                self.__driver, self.__element_timeout, poll_frequency=self.__POLL_INTERVAL
+            ).until(lambda _: self.__find(locator))
+        finally:
+            self.__wait_log.append(("element", time.time() - start))
+
+    def __find(self, locator: Locator):
         if locator.locator_type == LocatorType.NAME:
             return self.__driver.find_element_by_name(locator.value)
         elif locator.locator_type == LocatorType.ID:
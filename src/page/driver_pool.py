@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Lock
+
+import Setting
+from selenium.webdriver.chrome.service import Service
+
+from page.driver_manager import DriverManager
+
+
+class DriverPool:
+    # keeps warm browsers on one chromedriver service and hands them out instead of relaunching
+    def __init__(self, size: int):
+        self.__size = size
+        self.__service = Service(Setting.CHROMEDRIVER_LOCATION)
+        self.__service.start()
+        self.__ready: "Queue[DriverManager]" = Queue()
+        self.__executor = ThreadPoolExecutor(max_workers=size)
+        self.__lock = Lock()
+        self.__drivers = set()
+        for _ in range(size):
+            self.__executor.submit(self.__launch)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def acquire(self) -> DriverManager:
+        driver_manager = self.__ready.get()
+        if isinstance(driver_manager, Exception):  # launch failed in the background
+            raise driver_manager
+        return driver_manager
+
+    def release(self, driver_manager: DriverManager):
+        self.__executor.submit(self.__recycle, driver_manager)
+
+    def close(self):
+        self.__executor.shutdown(wait=True)
+        with self.__lock:
+            for driver_manager in self.__drivers:
+                driver_manager.quit()
+            self.__drivers.clear()
+        self.__service.stop()
+
+    def __launch(self):
+        try:
+            driver_manager = DriverManager(self.__service.service_url)
+            driver_manager.open("about:blank")
+        except Exception as e:
+            self.__ready.put(e)
+            return
+        with self.__lock:
+            self.__drivers.add(driver_manager)
+        self.__ready.put(driver_manager)
+
+    def __recycle(self, driver_manager: DriverManager):
+        try:
+            expired = (
+                driver_manager.navigation_count >= Setting.DRIVER_RECYCLE_NAVIGATIONS
+                or driver_manager.get_memory_usage() >= Setting.DRIVER_RECYCLE_MEMORY * 1024 ** 2
+            )
+            if not expired:
+                driver_manager.reset()
+                self.__ready.put(driver_manager)
+                return
+        except Exception:
+            pass
+        with self.__lock:
+            self.__drivers.discard(driver_manager)
+        try:
+            driver_manager.quit()
+        except Exception:
+            pass
+        self.__launch()
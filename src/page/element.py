@@ -1,29 +1,49 @@
+from typing import Dict, List
+
 from script.locator import Locator, LocatorType
 
 
 class Element:
-    def __init__(self, bs_elem, id_, attr_words, text_words):
-        self.__bs_elem = bs_elem
+    # compact record of an extracted element, it keeps no reference to the parsed page
+    __slots__ = (
+        "__id",
+        "__name",
+        "__attrs",
+        "__xpath",
+        "__locator",
+        "__attr_words",
+        "__text_words",
+    )
+    # attrs needed for the locator and the operation type
+    __ATTRS = ("id", "name", "type")
+
+    def __init__(self, id_, name: str, attrs, xpath: str, attr_words, text_words):
         self.__id = id_
-        self.__name = bs_elem.name
-        self.__xpath = self.__get_xpath()
-        self.__attr_words = attr_words
-        self.__text_words = text_words
-        self.__attr_vector = []
-        self.__text_vector = []
+        self.__name = name
+        self.__attrs: Dict[str, str] = {
+            attr: attrs[attr] for attr in self.__ATTRS if attr in attrs
+        }
+        self.__xpath = xpath
+        self.__locator = self.__create_locator()
+        self.__attr_words: List[str] = attr_words
+        self.__text_words: List[str] = text_words
+
+    def __str__(self):
+        attrs = "".join(' {}="{}"'.format(name, value) for name, value in self.__attrs.items())
+        return "<{}{}> {}".format(self.__name, attrs, " ".join(self.__text_words))
 
     @property
     def id(self):
         return self.__id
 
-    @property
-    def bs_elem(self):
-        return self.__bs_elem
-
     @property
     def name(self):
         return self.__name
 
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return self.__attrs
+
     @property
     def attr_words(self):
         return self.__attr_words
@@ -32,52 +52,24 @@ class Element:
     def text_words(self):
         return self.__text_words
 
-    @property
-    def attr_vector(self):
-        return self.__attr_vector
-
-    @attr_vector.setter
-    def attr_vector(self, vector):
-        self.__attr_vector = vector
-
-    @property
-    def text_vector(self):
-        return self.__text_vector
-
-    @text_vector.setter
-    def text_vector(self, text_vector):
-        self.__text_vector = text_vector
-
     @property
     def xpath(self):
         return self.__xpath
 
     def get_locator(self):
-        attrs = self.bs_elem.attrs
+        return self.__locator
+
+    def get_xpath(self):
+        return Locator(LocatorType.XPATH, self.__xpath)
+
+    def __create_locator(self):
+        attrs = self.__attrs
         if "id" in attrs:
             return Locator(LocatorType.ID, attrs["id"])
         elif "name" in attrs:
             if "type" in attrs and attrs["type"] == "radio":
-                return Locator(LocatorType.XPATH, self.__get_xpath())
+                return Locator(LocatorType.XPATH, self.__xpath)
             else:
                 return Locator(LocatorType.NAME, attrs["name"])
         else:
-            return Locator(LocatorType.XPATH, self.__get_xpath())
-
-    def get_xpath(self):
-        return Locator(LocatorType.XPATH, self.__get_xpath())
-
-    def __get_xpath(self):
-        components = []
-        child = self.bs_elem if self.bs_elem.name else self.bs_elem.parent
-        for parent in child.parents:
-            siblings = parent.find_all(child.name, recursive=False)
-            components.append(
-                child.name
-                if 1 == len(siblings)
-                else "%s[%d]"
-                % (child.name, next(i for i, s in enumerate(siblings, 1) if s is child))
-            )
-            child = parent
-        components.reverse()
-        return "/%s" % "/".join(components)
+            return Locator(LocatorType.XPATH, self.__xpath)
@@ -1,5 +1,6 @@
-from collections import defaultdict
-from typing import DefaultDict, List
+import re
+from hashlib import sha1
+from typing import List, Optional
 
 import Setting
 from calculator import VectorCalculator
@@ -7,53 +8,73 @@ from script.operation_type import OperationType
 from util.word_util import WordUtil
 
 from page.element import Element
-from page.page_manager import PageManager, Tags
+from page.page_manager import ElementRecord, PageManager, Tags
+from page.page_table import PageTable
 
 
 class ElementContainer:
+    # numbers in words, e.g. of timestamps, counters and tokens
+    __VOLATILE = re.compile(r"[0-9]+")
+
     def __init__(self, page_manager: PageManager):
         self.__page_manager = page_manager
 
     @property
-    def elems(self):
+    def elems(self) -> List[Element]:
         return self.__elems
 
-    def get_elems_of(self, operationType: OperationType) -> List[Element]:
-        return self.__elem_dict[operationType]
-
-    def extract_element(self):
+    def extract_element(self, html: Optional[str] = None):
         self.__elems = []
-        self.__bs_elems = self.__page_manager.get_elements()
-        for i, bs_elem in enumerate(self.__bs_elems):
+        bs_elems = self.__page_manager.get_elements(html)
+        for i, bs_elem in enumerate(bs_elems):
             if self.__is_invisible(bs_elem):
                 continue
             attr_words = self.__extract_attr_words(bs_elem)
             if attr_words == []:
                 continue
             text_words = self.__extract_text_words(bs_elem)
-            elem: Element = Element(bs_elem, i, attr_words, text_words)
+            xpath = self.__page_manager.get_xpath(bs_elem)
+            elem: Element = Element(i, bs_elem.name, bs_elem.attrs, xpath, attr_words, text_words)
             self.__elems.append(elem)
-        self.__create_elem_dict()
+        # the parsed page is not referenced from the elements
+        self.__page_manager.clear()
+
+    def load_element(self, elems: List[Element]):
+        # elements extracted before, e.g. from a SnapshotStore
+        self.__elems = elems
+
+    def get_fingerprint(self) -> str:
+        # structure of the page. the numbers in the words are ignored, so that a page with
+        # another timestamp or token is still the same page. attrs (locators) are kept as they are
+        digest = sha1()
+        for elem in self.__elems:
+            words = [self.__VOLATILE.sub("#", word) for word in elem.attr_words]
+            words.append("|")
+            words.extend(self.__VOLATILE.sub("#", word) for word in elem.text_words)
+            digest.update(repr((elem.name, elem.xpath, elem.attrs, words)).encode("utf-8"))
+        return digest.hexdigest()
 
-    def append_vector(self, vector_calculator: VectorCalculator):
-        for elem in self.elems:
-            elem.attr_vector = vector_calculator.get_elem_vector(elem)
-            elem.text_vector = vector_calculator.get_text_vector(elem)
+    def create_table(self, vector_calculator: VectorCalculator) -> PageTable:
+        return PageTable(
+            self.elems,
+            [self.__get_operation_types(elem) for elem in self.elems],
+            vector_calculator.get_elem_vectors(self.elems),
+            vector_calculator.get_text_vectors(self.elems),
+        )
 
-    def __create_elem_dict(self):
+    def __get_operation_types(self, elem: Element) -> List[OperationType]:
         # clicked types of <input>
         CLICK_TYPES = {"radio", "checkbox", "submit", "image", "button"}
-        self.__elem_dict: DefaultDict[OperationType, List[Element]] = defaultdict(list)
-        for elem in self.__elems:
-            bs_elem = elem.bs_elem
-            for operation_type in [OperationType.CLICK, OperationType.ENTER, OperationType.SELECT]:
-                if elem.name in Tags.get_target_tags(operation_type):
-                    self.__elem_dict[operation_type].append(elem)
-            if elem.name == "input":
-                if "type" in bs_elem.attrs and bs_elem["type"] in CLICK_TYPES:
-                    self.__elem_dict[OperationType.CLICK].append(elem)
-                else:
-                    self.__elem_dict[OperationType.ENTER].append(elem)
+        operation_types = []
+        for operation_type in [OperationType.CLICK, OperationType.ENTER, OperationType.SELECT]:
+            if elem.name in Tags.get_target_tags(operation_type):
+                operation_types.append(operation_type)
+        if elem.name == "input":
+            if "type" in elem.attrs and elem.attrs["type"] in CLICK_TYPES:
+                operation_types.append(OperationType.CLICK)
+            else:
+                operation_types.append(OperationType.ENTER)
+        return operation_types
 
     def __extract_attr_words(self, bs_elem):
         words = []
@@ -85,6 +106,9 @@ class ElementContainer:
             return []
 
     def __is_invisible(self, bs_elem):
+        # only elements extracted in the browser know whether they are rendered
+        if Setting.SKIP_UNRENDERED and isinstance(bs_elem, ElementRecord) and not bs_elem.visible:
+            return True
         return (
             "type" in bs_elem.attrs
             and bs_elem["type"] == "hidden"
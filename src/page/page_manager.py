@@ -1,9 +1,15 @@
+import os
+from collections import Counter, defaultdict
 from enum import Enum
 from functools import reduce
+from hashlib import sha1
 from operator import or_
+from typing import Dict, List, Optional
 
+import lxml.etree
+import lxml.html
 import Setting
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from script.operation_type import OperationType
 
 from page.driver_manager import DriverManager
@@ -31,23 +37,175 @@ class Tags(Enum):
 class HtmlParser:
     def __init__(self, html):
         self.__parser = BeautifulSoup(html, "html.parser")
+        self.__xpaths: Optional[Dict[int, str]] = None
 
     def find_all(self, tags):
         return self.__parser.find_all(tags)
 
-    def select(self, query):
-        return self.__parser.select(query)
+    def get_labels(self) -> Dict[str, List[str]]:
+        # texts of the labels by their "for"
+        labels: Dict[str, List[str]] = defaultdict(list)
+        for label in self.__parser.find_all("label"):
+            if "for" in label.attrs:
+                labels[label["for"]].append(label.text)
+        return labels
+
+    def get_xpath(self, tag: Tag) -> str:
+        if self.__xpaths is None:
+            self.__xpaths = self.__index_xpaths()
+        return self.__xpaths[id(tag)]
+
+    def __index_xpaths(self) -> Dict[int, str]:
+        # positional xpath of every tag in one traversal, counting the siblings of each parent once
+        xpaths: Dict[int, str] = {}
+        stack = [(self.__parser, "")]
+        while stack:
+            parent, prefix = stack.pop()
+            children = [child for child in parent.children if isinstance(child, Tag)]
+            counts = Counter(child.name for child in children)
+            indexes: Dict[str, int] = defaultdict(int)
+            for child in children:
+                indexes[child.name] += 1
+                if counts[child.name] == 1:
+                    xpath = "{}/{}".format(prefix, child.name)
+                else:
+                    xpath = "{}/{}[{}]".format(prefix, child.name, indexes[child.name])
+                xpaths[id(child)] = xpath
+                stack.append((child, xpath))
+        return xpaths
+
+
+class ElementRecord:
+    # an element extracted without BeautifulSoup, read like its tag
+    def __init__(self, name: str, attrs: Dict[str, str], text: str, xpath: str, visible: bool):
+        self.__name = name
+        self.__attrs = attrs
+        self.__text = text
+        self.__xpath = xpath
+        self.__visible = visible
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return self.__attrs
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
+    @property
+    def xpath(self) -> str:
+        return self.__xpath
+
+    @property
+    def visible(self) -> bool:
+        return self.__visible
+
+    def __getitem__(self, attr: str) -> str:
+        return self.__attrs[attr]
+
+    def __str__(self) -> str:
+        attrs = "".join(' {}="{}"'.format(name, value) for name, value in self.__attrs.items())
+        return "<{0}{1}>{2}</{0}>".format(self.__name, attrs, self.__text)
+
+
+class LxmlParser:
+    # the tree is built by libxml2, records are made only for the requested tags and the labels
+    __PARSER = lxml.html.HTMLParser(encoding="utf-8")
+    # text like bs4, without scripts and styles
+    __TEXTS = lxml.etree.XPath(
+        ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+    )
+
+    def __init__(self, html):
+        if html.strip() == "":
+            self.__root = None
+        else:
+            self.__root = lxml.html.document_fromstring(html.encode("utf-8"), parser=self.__PARSER)
+
+    def find_all(self, tags) -> List[ElementRecord]:
+        if self.__root is None:
+            return []
+        tree = self.__root.getroottree()
+        return [
+            ElementRecord(
+                elem.tag,
+                dict(elem.attrib),
+                self.__get_text(elem),
+                tree.getpath(elem),
+                True,  # unknown without rendering
+            )
+            for elem in self.__root.iter(*tags)
+        ]
+
+    def get_labels(self) -> Dict[str, List[str]]:
+        labels: Dict[str, List[str]] = defaultdict(list)
+        if self.__root is not None:
+            for label in self.__root.iter("label"):
+                if "for" in label.attrib:
+                    labels[label.attrib["for"]].append(self.__get_text(label))
+        return labels
+
+    def __get_text(self, elem) -> str:
+        return "".join(self.__TEXTS(elem))
 
 
 class PageManager:
     def __init__(self, driver_manager: DriverManager):
         self.__driver_manager = driver_manager
+        self.__labels: Dict[str, List[str]] = {}
+        self.__parser = None
 
-    def get_elements(self):
-        html = self.__driver_manager.get_page_source()
-        self.__parser = HtmlParser(html)
+    def get_elements(self, html: Optional[str] = None):
+        if html is None and Setting.EXTRACT_IN_BROWSER:
+            if Setting.SAVE_PAGE:
+                self.__save(self.__driver_manager.get_page_source())
+            return self.__extract_in_browser()
+        if html is None:
+            html = self.__driver_manager.get_page_source()
+            if Setting.SAVE_PAGE:
+                self.__save(html)
+        if Setting.HTML_PARSER == "lxml":
+            self.__parser = LxmlParser(html)
+        else:
+            self.__parser = HtmlParser(html)
+        self.__labels = self.__parser.get_labels()
         bs_elems = self.__parser.find_all(Tags.get_all_tags())
         return bs_elems
 
+    def get_xpath(self, elem) -> str:
+        if isinstance(elem, ElementRecord):
+            return elem.xpath
+        return self.__parser.get_xpath(elem)
+
     def get_associated_labels(self, for_id):
-        return [label.text for label in self.__parser.select("label[for='{}']".format(for_id))]
+        # looked up in the index built with the elements, whichever way they were extracted
+        return self.__labels.get(for_id, [])
+
+    def clear(self):
+        # free the parsed page
+        self.__parser = None
+        self.__labels = {}
+
+    def __extract_in_browser(self) -> List[ElementRecord]:
+        # no page source is transferred or parsed
+        extracted = self.__driver_manager.extract_elements(
+            Tags.get_all_tags(), Setting.EXCEPT_ATTRS
+        )
+        self.__labels = extracted["labels"]
+        return [
+            ElementRecord(
+                record["name"], record["attrs"], record["text"], record["xpath"], record["visible"]
+            )
+            for record in extracted["elements"]
+        ]
+
+    def __save(self, html):
+        directory = Setting.PAGE_DIRECTORY + "/" + Setting.TESTCASE_FILE
+        os.makedirs(directory, exist_ok=True)
+        filename = "{}/{}.html".format(directory, sha1(html.encode("utf-8")).hexdigest())
+        with open(filename, mode="w") as f:
+            f.write(html)
@@ -0,0 +1,57 @@
+from typing import List
+
+import numpy
+from script.operation_type import OperationType
+
+from page.element import Element
+
+
+class PageTable:
+    # the elements of a page as columns, one row per element in document order
+    __BITS = {OperationType.ENTER: 1, OperationType.SELECT: 2, OperationType.CLICK: 4}
+
+    def __init__(
+        self,
+        elems: List[Element],
+        operation_types: List[List[OperationType]],
+        attr_vectors,
+        text_vectors,
+    ):
+        self.__elems = elems
+        self.__attr_vectors = attr_vectors
+        self.__text_vectors = text_vectors
+        self.__has_text = numpy.array([len(elem.text_words) != 0 for elem in elems], dtype=bool)
+        self.__operation_types = numpy.array(
+            [sum(self.__BITS[type_] for type_ in types) for types in operation_types],
+            dtype=numpy.uint8,
+        )
+
+    def __len__(self) -> int:
+        return len(self.__elems)
+
+    @property
+    def elems(self) -> List[Element]:
+        return self.__elems
+
+    @property
+    def attr_vectors(self):
+        # (elements x dimension), L2-normalized
+        return self.__attr_vectors
+
+    @property
+    def text_vectors(self):
+        # (elements x dimension), L2-normalized, zero where has_text is False
+        return self.__text_vectors
+
+    @property
+    def has_text(self):
+        return self.__has_text
+
+    @property
+    def operation_types(self):
+        # bitmask of the operation types of each element
+        return self.__operation_types
+
+    def get_indexes(self, operation_type: OperationType):
+        # rows of the elements of the operation type, in document order
+        return numpy.flatnonzero(self.__operation_types & self.__BITS[operation_type])
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import pickle
+import tempfile
+from hashlib import sha1
+from typing import List, Optional
+
+import Setting
+
+from page.element import Element
+
+
+class Snapshot:
+    # an extracted page and whether an operation of the last page variation to it raised
+    def __init__(self, elems: List[Element], failed: bool):
+        self.__elems = elems
+        self.__failed = failed
+
+    @property
+    def elems(self) -> List[Element]:
+        return self.__elems
+
+    @property
+    def failed(self) -> bool:
+        return self.__failed
+
+
+class SnapshotStore:
+    # extracted pages saved on disk by the actions that lead to them, shared by all runs
+    SUFFIX = ".pickle.gz"
+    # part of the key, changed with the records or the Element signature
+    __VERSION = 2
+
+    def __init__(self, directory: str):
+        self.__directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, key: str) -> Optional[Snapshot]:
+        try:
+            with gzip.open(self.__get_path(key), mode="rb") as f:
+                failed, records = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return Snapshot([Element(*record) for record in records], failed)
+
+    def save(self, key: str, snapshot: Snapshot):
+        records = [
+            (elem.id, elem.name, elem.attrs, elem.xpath, elem.attr_words, elem.text_words)
+            for elem in snapshot.elems
+        ]
+        # written aside and renamed, so that parallel runs never read a partial snapshot
+        fd, temp_path = tempfile.mkstemp(dir=self.__directory)
+        with os.fdopen(fd, mode="wb") as f:
+            with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                pickle.dump((snapshot.failed, records), gz, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.__get_path(key))
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.__directory, key + self.SUFFIX)
+
+    @classmethod
+    def get_key(cls, url: str, actions: List[List[str]]) -> str:
+        # actions are the codes of the operations executed on each page after opening url.
+        # the settings that change the extracted elements are part of the key
+        settings = [
+            cls.__VERSION,
+            Setting.EXTRACT_IN_BROWSER,
+            Setting.HTML_PARSER,
+            sorted(Setting.EXCEPT_ATTRS),
+            sorted(Setting.STOP_WORDS | Setting.HEURISTIC_STOP_WORDS),
+            sorted(Setting.TAG_CLICK),
+        ]
+        return sha1(json.dumps([url, actions, settings]).encode("utf-8")).hexdigest()
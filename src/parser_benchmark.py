@@ -0,0 +1,51 @@
+import glob
+import traceback
+from time import perf_counter, time
+
+import Setting
+from page.element_container import ElementContainer
+from page.page_manager import PageManager
+
+BACKENDS = ["html.parser", "lxml"]
+
+start = time()
+try:
+    pages = sorted(glob.glob(Setting.PAGE_DIRECTORY + "/*/*.html"))
+    htmls = []
+    for page in pages:
+        with open(page) as f:
+            htmls.append(f.read())
+    print("{} pages in {}".format(len(htmls), Setting.PAGE_DIRECTORY))
+    element_container = ElementContainer(PageManager(None))
+    extracted = []
+    for backend in BACKENDS:
+        Setting.HTML_PARSER = backend
+        times = []
+        results = []
+        for html in htmls:
+            begin = perf_counter()
+            element_container.extract_element(html)
+            times.append(perf_counter() - begin)
+            results.append(
+                [
+                    (elem.xpath, sorted(elem.attr_words), sorted(elem.text_words))
+                    for elem in element_container.elems
+                ]
+            )
+        extracted.append(results)
+        if len(times) > 0:
+            print(
+                "{}: parse and extraction {:.2f}[ms/page] on average, {:.2f}[ms] at most".format(
+                    backend, 1000 * sum(times) / len(times), 1000 * max(times)
+                )
+            )
+    different = sum(
+        any(results[i] != extracted[0][i] for results in extracted) for i in range(len(htmls))
+    )
+    print("{} pages extracted differently from {}".format(different, BACKENDS[0]))
+except Exception as e:
+    print(e)
+    traceback.print_exc()
+finally:
+    elapsed_time = time() - start
+    print("elapsed_time:{0}".format(elapsed_time) + "[sec]")
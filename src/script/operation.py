@@ -1,5 +1,4 @@
 from abc import ABCMeta, abstractmethod, abstractproperty
-from time import sleep
 from typing import Optional
 
 import Setting
@@ -88,7 +87,7 @@ class Open(ExecutableOperation):
 
     def execute(self, driver_manager: DriverManager) -> None:
         driver_manager.open(self.value)
-        sleep(Setting.TRANSITION_SLEEP_TIME)
+        driver_manager.wait_for_page()
 
 
 class Enter(LocatableOperation):
@@ -116,7 +115,7 @@ class Enter(LocatableOperation):
         )
 
     def execute(self, locator: Locator, driver_manager: DriverManager) -> None:
-        sleep(Setting.SLEEP_TIME)
+        driver_manager.wait_for_operation()
         if Setting.SHOW_OPERATION:
             print("enter {} in {}".format(self.value, locator.value))
         driver_manager.enter(locator, self.value)
@@ -141,7 +140,7 @@ class Select(LocatableOperation):
         )
 
     def execute(self, locator: Locator, driver_manager: DriverManager) -> None:
-        sleep(Setting.SLEEP_TIME)
+        driver_manager.wait_for_operation()
         if Setting.SHOW_OPERATION:
             print("select {} from {}".format(self.value, locator.value))
         driver_manager.select(locator, self.value)
@@ -161,7 +160,7 @@ class Click(LocatableOperation):
         )
 
     def execute(self, locator: Locator, driver_manager: DriverManager) -> None:
-        sleep(Setting.SLEEP_TIME)
+        driver_manager.wait_for_operation()
         if Setting.SHOW_OPERATION:
             print("click {}".format(locator.value))
         driver_manager.click(locator)
@@ -44,6 +44,16 @@ class LocatorWriter:
         cls.__script = cls.__script[:-2]
         cls.__script += "\n"
 
+    @classmethod
+    def flush(cls) -> str:
+        script = cls.__script
+        cls.__script = ""
+        return script
+
+    @classmethod
+    def extend(cls, script: str):
+        cls.__script += script
+
     @classmethod
     def write(cls):
         date = datetime.datetime.now().strftime("%y%m%d%H%M")
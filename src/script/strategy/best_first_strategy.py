@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import sys
+import traceback
+from typing import Dict, List, Optional, Set, Tuple
+
+import Setting
+from page.driver_pool import DriverPool
+from script.operation import LocatableOperation
+from script.operation_type import OperationType
+from script.strategy.explorer import Explorer
+from script.strategy.search_tree import PageVariation, SearchTree, State
+from script.strategy.strategy import Strategy
+from script.test_case import TestCase
+
+
+class BestFirstStrategy(Strategy):
+    # A* over the search tree: the state with the best score plus the optimistic score of its
+    # remaining pages is expanded next, and the first complete state popped cannot be beaten
+    def __init__(self, model, driver_pool: Optional[DriverPool] = None):
+        self.__driver_pool = driver_pool
+        self.__model = model
+        self.__root = SearchTree(0, None)
+        self.__explorer: Optional[Explorer] = None
+        self.__operation_types: List[Set[OperationType]] = []
+        # best score of each operation type on the pages observed so far
+        self.__estimates: Dict[OperationType, float] = {}
+
+    def to_code(self, test_case: TestCase) -> str:
+        try:
+            page_steps = self.filter_by_type_and_split(test_case.steps, LocatableOperation)
+            self.__explorer = Explorer(
+                self.__model, test_case.open, self.__root, page_steps, self.__driver_pool
+            )
+            best_state = self.__search(page_steps)
+            self.__root.print()
+            if Setting.SMART_WAIT:
+                print("wait time: {:.2f}[sec]".format(self.__explorer.wait_time))
+            return self.construct_method_string(test_case, best_state.path)
+        except Exception as e:
+            print(e)
+            traceback.print_exc()
+            sys.exit(1)
+        finally:
+            if self.__explorer is not None:
+                self.__explorer.close()
+
+    def __search(self, page_steps: List[List[LocatableOperation]]) -> State:
+        self.__operation_types = [{step.operation_type for step in steps} for steps in page_steps]
+        counter = itertools.count()
+        heap: List[Tuple[float, int, int, State]] = []
+
+        def push(state: State):
+            depth = len(state.path)
+            score = state.search_tree.total_score + self.__get_bound(depth)
+            # deeper states first on ties, then in the order they were found
+            heapq.heappush(heap, (-score, -depth, next(counter), state))
+
+        push(State(self.__root, []))
+        # pages already expanded at each depth. the bound only depends on the depth, so the
+        # state popped first for a page is the best one that reached it
+        expanded: List[Set[str]] = [set() for _ in page_steps]
+        expansions = 0
+        while True:
+            negative_score, _, _, state = heapq.heappop(heap)
+            depth = len(state.path)
+            if state.search_tree.total_score + self.__get_bound(depth) < -negative_score:
+                push(state)  # the estimates went down since it was pushed
+                continue
+            if depth == len(page_steps):
+                return state
+            if expansions >= Setting.BEST_FIRST_EXPANSIONS:
+                return self.__complete([state] + [entry[3] for entry in heap], page_steps)
+            expansion = self.__explorer.expand([state])[0]
+            expansions += 1
+            self.__update_estimates(depth, expansion.page_variations)
+            if Setting.MERGE_STATES and expansion.fingerprint in expanded[depth]:
+                continue
+            expanded[depth].add(expansion.fingerprint)
+            for child in self.__add_children(state, expansion.page_variations):
+                push(child)
+
+    def __complete(
+        self, states: List[State], page_steps: List[List[LocatableOperation]]
+    ) -> State:
+        # out of expansions: follow the best page variation of every remaining page from the
+        # deepest open state, the best one of that depth
+        print("best-first search stopped, completing the deepest state greedily")
+        state = max(states, key=lambda s: (len(s.path), s.search_tree.total_score))
+        while len(state.path) < len(page_steps):
+            expansion = self.__explorer.expand([state])[0]
+            state = self.__add_children(state, expansion.page_variations[:1])[0]
+        return state
+
+    def __add_children(self, state: State, page_variations) -> List[State]:
+        tree = state.search_tree
+        children = []
+        for page_variation in page_variations[: Setting.SEARCH_WIDTH]:
+            child = SearchTree(tree.total_score + page_variation.score, page_variation, tree)
+            tree.children.append(child)
+            children.append(State(child, state.path + [page_variation]))
+        return children
+
+    def __get_bound(self, depth: int) -> float:
+        # estimated score of the pages from depth on: per operation type of a page, the best
+        # score of the type observed so far, BEST_FIRST_BOUND before one is observed
+        return sum(
+            self.__estimates.get(operation_type, Setting.BEST_FIRST_BOUND)
+            for operation_types in self.__operation_types[depth:]
+            for operation_type in operation_types
+        )
+
+    def __update_estimates(self, depth: int, page_variations: List[PageVariation]):
+        if len(page_variations) == 0:
+            return
+        for operation_type in self.__operation_types[depth]:
+            variation = page_variations[0].get(operation_type)
+            if variation is not None:
+                self.__estimates[operation_type] = max(
+                    self.__estimates.get(operation_type, variation.score), variation.score
+                )
@@ -0,0 +1,328 @@
+import heapq
+import itertools
+from collections import defaultdict
+from typing import Iterator, List, Optional, Set, Tuple
+
+import numpy
+import Setting
+from calculator import IdfCalculator, VectorCalculator
+from page.driver_manager import DriverManager
+from page.driver_pool import DriverPool
+from page.element import Element
+from page.element_container import ElementContainer
+from page.page_manager import PageManager
+from page.snapshot_store import Snapshot, SnapshotStore
+from script.operation import LocatableOperation, Open
+from script.operation_type import OperationType
+from script.strategy.page_cache import PageCache, ScoredPage
+from script.strategy.replay_scheduler import ReplayScheduler
+from script.strategy.search_tree import PageVariation, SearchTree, State, Variation
+from util.assignment_util import AssignmentUtil
+from util.word_util import WordUtil
+
+
+class Expansion:
+    # the page a state reached and its page variations
+    def __init__(
+        self, fingerprint: str, page_variations: List[PageVariation], failed: bool = False
+    ):
+        self.__fingerprint = fingerprint
+        self.__page_variations = page_variations
+        self.__failed = failed
+
+    @property
+    def fingerprint(self) -> str:
+        return self.__fingerprint
+
+    @property
+    def page_variations(self) -> List[PageVariation]:
+        return self.__page_variations
+
+    @property
+    def failed(self) -> bool:
+        # an operation of the last page variation on the way raised, e.g. its element was not found
+        return self.__failed
+
+
+class Explorer:
+    # one browser that reaches search states and extracts the page variations found there
+    def __init__(
+        self,
+        model,
+        open_step: Open,
+        root: SearchTree,
+        page_steps: List[List[LocatableOperation]],
+        driver_pool: Optional[DriverPool] = None,
+    ):
+        self.__model = model
+        self.__open = open_step
+        self.__root = root
+        self.__page_steps = page_steps
+        self.__driver_pool = driver_pool
+        # the browser is launched when a state has to be reached in it
+        self.__driver_manager: Optional[DriverManager] = None
+        self.__element_container = ElementContainer(PageManager(None))
+        self.__scheduler = ReplayScheduler()
+        self.__snapshot_store: Optional[SnapshotStore] = None
+        if Setting.USE_SNAPSHOT:
+            self.__snapshot_store = SnapshotStore(Setting.SNAPSHOT_DIRECTORY)
+        self.__wait_time = 0.0
+        # nodes whose page variation raised when it was executed
+        self.__failed: Set[SearchTree] = set()
+
+    def expand(self, states: List[State]) -> List[Expansion]:
+        # the page of each state, in the order of states. a complete state has no page variations
+        expansions: List[Optional[Expansion]] = [None] * len(states)
+        for index in self.__scheduler.order([state.search_tree for state in states]):
+            tree = states[index].search_tree
+            path = states[index].path
+            self.__reach(path, tree)
+            fingerprint = self.__element_container.get_fingerprint()
+            page_variations = []
+            if len(path) < len(self.__page_steps):
+                page_variations = self.__get_page_variations(
+                    fingerprint, self.__page_steps[len(path)]
+                )
+            expansions[index] = Expansion(fingerprint, page_variations, tree in self.__failed)
+            self.__scheduler.done(tree)
+        return expansions
+
+    @property
+    def wait_time(self) -> float:
+        # seconds spent waiting for pages and elements by all the browsers used so far
+        if self.__driver_manager is None:
+            return self.__wait_time
+        return self.__wait_time + self.__driver_manager.wait_time
+
+    def close(self):
+        if self.__driver_manager is not None:
+            self.__close_driver_manager()
+
+    def __reach(self, path: List[PageVariation], tree: SearchTree):
+        # extract the page of tree, from its snapshot if there is one. the browser does not move
+        # on a hit, the checkpoints of the tree are taken when a later replay passes through it
+        if self.__snapshot_store is not None:
+            key = self.__get_snapshot_key(path)
+            snapshot = self.__snapshot_store.load(key)
+            if snapshot is not None:
+                self.__element_container.load_element(snapshot.elems)
+                if snapshot.failed:
+                    self.__failed.add(tree)
+                return
+        self.__execute_prev_transition(self.__page_steps, path, tree)
+        if Setting.USE_CHECKPOINT and self.__scheduler.get_checkpoint(tree) is None:
+            self.__scheduler.set_checkpoint(tree, self.__driver_manager.checkpoint())
+        self.__element_container.extract_element()
+        if self.__snapshot_store is not None:
+            snapshot = Snapshot(self.__element_container.elems, tree in self.__failed)
+            self.__snapshot_store.save(key, snapshot)
+
+    def __get_snapshot_key(self, path: List[PageVariation]) -> str:
+        actions = [
+            [step.to_code(elem.get_locator()) for step, elem in self.__get_operations(steps, page)]
+            for steps, page in zip(self.__page_steps, path)
+        ]
+        return SnapshotStore.get_key(self.__open.value, actions)
+
+    def __get_page_variations(
+        self, fingerprint: str, steps_in_page: List[LocatableOperation]
+    ) -> List[PageVariation]:
+        page = PageCache.get(fingerprint)
+        if page is None:
+            idf = IdfCalculator().calc(self.__element_container.elems)
+            vector_calculator = VectorCalculator(self.__model, idf)
+            table = self.__element_container.create_table(vector_calculator)
+            page = ScoredPage(table, vector_calculator)
+            PageCache.put(fingerprint, page)
+        enter_variations = self.__get_variation_by_type(
+            steps_in_page, page, OperationType.ENTER
+        )[: Setting.SEARCH_WIDTH]
+        select_variations = self.__get_variation_by_type(
+            steps_in_page, page, OperationType.SELECT
+        )[: Setting.SEARCH_WIDTH]
+        click_variations = self.__get_variation_by_type(
+            steps_in_page, page, OperationType.CLICK
+        )[: Setting.SEARCH_WIDTH]
+
+        return list(
+            itertools.islice(
+                self.__merge_variations(enter_variations, select_variations, click_variations),
+                Setting.SEARCH_WIDTH,
+            )
+        )
+
+    def __merge_variations(
+        self,
+        enter_variations: List[Optional[Variation]],
+        select_variations: List[Optional[Variation]],
+        click_variations: List[Optional[Variation]],
+    ) -> Iterator[PageVariation]:
+        # lazy k-way merge over the sorted variation lists: page score is additive, so the next
+        # best page variation is always a neighbour of one already yielded.
+        # equal scores come out in itertools.product order
+        variations = [enter_variations, select_variations, click_variations]
+
+        def create(indexes: Tuple[int, int, int]) -> PageVariation:
+            return PageVariation(
+                {
+                    operation_type: variation_list[index]
+                    for operation_type, variation_list, index in zip(
+                        [OperationType.ENTER, OperationType.SELECT, OperationType.CLICK],
+                        variations,
+                        indexes,
+                    )
+                }
+            )
+
+        start = (0, 0, 0)
+        first = create(start)
+        heap = [(-first.score, start, first)]
+        visited = {start}
+        while heap:
+            _, indexes, page_variation = heapq.heappop(heap)
+            yield page_variation
+            for axis in range(3):
+                next_indexes = tuple(index + (i == axis) for i, index in enumerate(indexes))
+                if next_indexes[axis] >= len(variations[axis]) or next_indexes in visited:
+                    continue
+                visited.add(next_indexes)
+                next_variation = create(next_indexes)
+                heapq.heappush(heap, (-next_variation.score, next_indexes, next_variation))
+
+    def __get_variation_by_type(
+        self,
+        steps_in_page: List[LocatableOperation],
+        page: ScoredPage,
+        operation_type: OperationType,
+    ) -> List[Optional[Variation]]:
+        steps = [step for step in steps_in_page if step.operation_type == operation_type]
+        queries = [WordUtil.filter(step.target.split()) for step in steps]
+        key = (operation_type, tuple(tuple(query) for query in queries))
+        if key not in page.variations:
+            page.variations[key] = self.__score_variations(page, operation_type, queries)
+        return page.variations[key]
+
+    def __score_variations(
+        self, page: ScoredPage, operation_type: OperationType, queries: List[List[str]]
+    ) -> List[Optional[Variation]]:
+        table = page.table
+        indexes = table.get_indexes(operation_type)
+        similarity = page.vector_calculator.get_similarity_matrix(queries, table, indexes)
+        variations: List[Optional[Variation]] = []
+        candidates_list = self.__filter_elements(similarity)
+        candidates = AssignmentUtil.k_best(similarity, candidates_list, Setting.SEARCH_WIDTH)
+        if len(queries) == 0 or len(candidates) == 0:
+            scores = [0] * len(candidates)
+        else:
+            # candidates x steps similarities of the assigned elements
+            scores = similarity[numpy.arange(len(queries)), numpy.array(candidates)].sum(axis=1)
+            scores /= len(queries)
+        for candidate, score in zip(candidates, scores):
+            elems = tuple(table.elems[i] for i in indexes[list(candidate)])
+            variations.append(Variation(elems, score))
+        if variations == []:
+            return [None]
+        else:
+            return sorted(variations, key=lambda c: c.score, reverse=True)
+
+    def __filter_elements(self, similarity) -> List[List[int]]:
+        # indexes of the top PAGE_MATCHING_SEARCH elements of each step, best first
+        candidates_list: List[List[int]] = []
+        min_num = min(Setting.PAGE_MATCHING_SEARCH, similarity.shape[1])
+        for row in similarity:
+            if min_num == 0:
+                candidates_list.append([])
+                continue
+            top = numpy.argpartition(-row, min_num - 1)[:min_num]
+            top = top[numpy.lexsort((top, -row[top]))]
+            candidates_list.append(top.tolist())
+        return candidates_list
+
+    def __execute_page_variation(
+        self,
+        steps_in_page: List[LocatableOperation],
+        page_variation: PageVariation,
+    ) -> bool:
+        # False if an operation raised, the remaining ones are executed anyway
+        succeeded = True
+        for step, elem in self.__get_operations(steps_in_page, page_variation):
+            try:
+                step.execute(elem.get_locator(), self.__driver_manager)
+            except Exception:
+                succeeded = False
+        return succeeded
+
+    def __get_operations(
+        self,
+        steps_in_page: List[LocatableOperation],
+        page_variation: PageVariation,
+    ) -> Iterator[Tuple[LocatableOperation, Element]]:
+        # the steps of the page with the elements page_variation assigns them, in step order
+        indexes = defaultdict(int)
+        for step in steps_in_page:
+            if isinstance(step, LocatableOperation):
+                if page_variation.get(step.operation_type) is None:
+                    continue
+                nextStep = page_variation.get(step.operation_type).variation[
+                    indexes[step.operation_type]
+                ]
+                indexes[step.operation_type] += 1
+                yield step, nextStep
+
+    def __new_driver_manager(self) -> DriverManager:
+        if self.__driver_pool is not None:
+            return self.__driver_pool.acquire()
+        return DriverManager()
+
+    def __close_driver_manager(self):
+        self.__wait_time += self.__driver_manager.wait_time
+        if self.__driver_pool is not None:
+            self.__driver_pool.release(self.__driver_manager)
+        else:
+            self.__driver_manager.quit()
+
+    def __execute_prev_transition(
+        self,
+        page_steps: List[List[LocatableOperation]],
+        path: List[PageVariation],
+        tree: SearchTree,
+    ):
+        if tree is self.__scheduler.position:
+            return
+        restarted = False
+        while True:
+            anchor = self.__scheduler.get_anchor(tree)
+            if anchor is not None and anchor is self.__scheduler.position:
+                break
+            if self.__driver_manager is None or Setting.RESTART_DRIVER and not restarted:
+                if self.__driver_manager is not None:
+                    self.__close_driver_manager()
+                self.__driver_manager = self.__new_driver_manager()
+                # an element of a wrong candidate is not waited for as long as a real one
+                self.__driver_manager.element_timeout = Setting.PROBE_TIMEOUT
+                self.__element_container = ElementContainer(PageManager(self.__driver_manager))
+                restarted = True
+            if anchor is None:
+                if self.__driver_manager.restored:
+                    # the replay starts from the session of no checkpoint
+                    self.__driver_manager.clear_session()
+                self.__open.execute(self.__driver_manager)
+                anchor = self.__root
+                break
+            if self.__driver_manager.restore(self.__scheduler.get_checkpoint(anchor)):
+                break
+            self.__scheduler.discard(anchor)  # go back to an earlier state
+        nodes = [tree]
+        while nodes[-1].parent is not None:
+            nodes.append(nodes[-1].parent)
+        nodes.reverse()
+        self.__scheduler.arrive(None)
+        for depth in range(nodes.index(anchor), len(path)):
+            # keep the fork points of the remaining candidates restorable
+            node = nodes[depth]
+            if self.__scheduler.needs_checkpoint(node):
+                self.__scheduler.set_checkpoint(node, self.__driver_manager.checkpoint())
+            if not self.__execute_page_variation(page_steps[depth], path[depth]):
+                self.__failed.add(nodes[depth + 1])
+            self.__driver_manager.wait_for_page()
+        self.__scheduler.arrive(tree)
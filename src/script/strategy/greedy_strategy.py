@@ -0,0 +1,129 @@
+import sys
+import traceback
+from typing import Dict, List, Optional
+
+import Setting
+from page.driver_pool import DriverPool
+from script.operation import LocatableOperation
+from script.operation_type import OperationType
+from script.strategy.explorer import Expansion, Explorer
+from script.strategy.search_tree import PageVariation, SearchTree, State
+from script.strategy.strategy import Strategy
+from script.test_case import TestCase
+
+
+class GreedyStrategy(Strategy):
+    # follows the best page variation of every page and backtracks to the next ranked one
+    # only when the page it reached looks wrong
+    def __init__(self, model, driver_pool: Optional[DriverPool] = None):
+        self.__driver_pool = driver_pool
+        self.__model = model
+        self.__root = SearchTree(0, None)
+        self.__explorer: Optional[Explorer] = None
+        self.__expansions: Dict[SearchTree, Expansion] = {}
+        self.__children: Dict[SearchTree, List[State]] = {}
+
+    def to_code(self, test_case: TestCase) -> str:
+        try:
+            page_steps = self.filter_by_type_and_split(test_case.steps, LocatableOperation)
+            self.__explorer = Explorer(
+                self.__model, test_case.open, self.__root, page_steps, self.__driver_pool
+            )
+            state = self.__search(page_steps, Setting.GREEDY_BACKTRACKS)
+            if state is None:
+                print("every alternative looks wrong, keeping the greedy path")
+                state = self.__search(page_steps, 0)
+            self.__root.print()
+            if Setting.SMART_WAIT:
+                print("wait time: {:.2f}[sec]".format(self.__explorer.wait_time))
+            return self.construct_method_string(test_case, state.path)
+        except Exception as e:
+            print(e)
+            traceback.print_exc()
+            sys.exit(1)
+        finally:
+            if self.__explorer is not None:
+                self.__explorer.close()
+
+    def __search(
+        self, page_steps: List[List[LocatableOperation]], backtracks: int
+    ) -> Optional[State]:
+        # depth-first in the order of the scores, None if every alternative was rejected
+        root = State(self.__root, [])
+        # remaining alternatives of each depth on the current path
+        stack = [list(self.__get_children(root))]
+        fingerprints = [self.__expand(root).fingerprint]
+        while len(stack) > 0:
+            if len(stack[-1]) == 0:
+                stack.pop()
+                fingerprints.pop()
+                continue
+            state = stack[-1].pop(0)
+            expansion = self.__expand(state)
+            if len(state.path) == len(page_steps):
+                # the last page variation is executed too. only its failure is a signal, the
+                # last click may well save with ajax and stay on the page
+                if backtracks > 0 and expansion.failed:
+                    print("an element was not found")
+                    backtracks -= 1
+                    if backtracks > 0:
+                        continue
+                    print("out of backtracks, keeping the path")
+                return state
+            if backtracks > 0 and self.__is_wrong(state, expansion, fingerprints[-1], page_steps):
+                backtracks -= 1
+                if backtracks > 0:
+                    continue
+                # the last rejected page is kept rather than an unchecked lower-ranked one
+                print("out of backtracks, keeping the path")
+            stack.append(list(self.__get_children(state)))
+            fingerprints.append(expansion.fingerprint)
+        return None
+
+    def __is_wrong(
+        self,
+        state: State,
+        expansion: Expansion,
+        prev_fingerprint: str,
+        page_steps: List[List[LocatableOperation]],
+    ) -> bool:
+        page_variation = state.path[-1]
+        if expansion.failed:
+            print("an element was not found")
+            return True
+        if (
+            page_variation.get(OperationType.CLICK) is not None
+            and expansion.fingerprint == prev_fingerprint
+        ):
+            print("the page did not change after the click")
+            return True
+        # mean similarity of the steps of the next page, per operation type
+        operation_types = {step.operation_type for step in page_steps[len(state.path)]}
+        if len(operation_types) > 0:
+            best_score = expansion.page_variations[0].score / len(operation_types)
+            if best_score < Setting.GREEDY_MIN_SCORE:
+                print("the next page does not match its steps")
+                return True
+        return False
+
+    def __expand(self, state: State) -> Expansion:
+        # each state is observed once, also when the search is run again
+        tree = state.search_tree
+        if tree not in self.__expansions:
+            self.__expansions[tree] = self.__explorer.expand([state])[0]
+        return self.__expansions[tree]
+
+    def __get_children(self, state: State) -> List[State]:
+        tree = state.search_tree
+        if tree not in self.__children:
+            self.__children[tree] = [
+                self.__add_child(state, page_variation)
+                for page_variation in self.__expand(state).page_variations[: Setting.SEARCH_WIDTH]
+            ]
+        return self.__children[tree]
+
+    def __add_child(self, state: State, page_variation: PageVariation) -> State:
+        tree = state.search_tree
+        child = SearchTree(tree.total_score + page_variation.score, page_variation, tree)
+        tree.children.append(child)
+        return State(child, state.path + [page_variation])
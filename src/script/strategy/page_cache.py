@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, List, Optional
+
+import Setting
+from calculator import VectorCalculator
+from page.page_table import PageTable
+
+from script.strategy.search_tree import Variation
+
+
+class ScoredPage:
+    # what scoring a page computes, shared by every state that shows the same page
+    def __init__(self, table: PageTable, vector_calculator: VectorCalculator):
+        self.__table = table
+        self.__vector_calculator = vector_calculator
+        self.__variations: Dict[Hashable, List[Optional[Variation]]] = {}
+
+    @property
+    def table(self) -> PageTable:
+        return self.__table
+
+    @property
+    def vector_calculator(self) -> VectorCalculator:
+        return self.__vector_calculator
+
+    @property
+    def variations(self) -> Dict[Hashable, List[Optional[Variation]]]:
+        # variations of an operation type by its queries
+        return self.__variations
+
+
+class PageCache:
+    # LRU of the scored pages of the run by page fingerprint
+    __pages: "OrderedDict[str, ScoredPage]" = OrderedDict()
+    __lock = Lock()
+
+    @classmethod
+    def get(cls, fingerprint: str) -> Optional[ScoredPage]:
+        with cls.__lock:
+            page = cls.__pages.get(fingerprint)
+            if page is not None:
+                cls.__pages.move_to_end(fingerprint)
+            return page
+
+    @classmethod
+    def put(cls, fingerprint: str, page: ScoredPage):
+        if Setting.PAGE_CACHE_SIZE <= 0:
+            return
+        with cls.__lock:
+            cls.__pages[fingerprint] = page
+            cls.__pages.move_to_end(fingerprint)
+            while len(cls.__pages) > Setting.PAGE_CACHE_SIZE:
+                cls.__pages.popitem(last=False)
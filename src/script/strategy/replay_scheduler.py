@@ -0,0 +1,87 @@
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Optional, Set, Tuple
+
+import Setting
+from page.driver_manager import Checkpoint
+from script.strategy.search_tree import SearchTree
+
+
+class ReplayScheduler:
+    # visits the candidates of a depth along the search tree (a trie of their paths) and reaches
+    # each one from the closest available state: the page the browser is on, a checkpoint on the
+    # shared prefix, or TestCase.open
+    def __init__(self):
+        self.__position: Optional[SearchTree] = None
+        self.__pending: DefaultDict[SearchTree, int] = defaultdict(int)
+        self.__unrestorable: Set[SearchTree] = set()
+        # browser state at the page reached by a node, before its children's operations.
+        # kept per browser: restoring the cookies of another browser would share its session
+        self.__checkpoints: Dict[SearchTree, Checkpoint] = {}
+
+    @property
+    def position(self) -> Optional[SearchTree]:
+        # node whose page the browser shows, with no operation executed on it yet
+        return self.__position
+
+    def arrive(self, tree: Optional[SearchTree]):
+        self.__position = tree
+
+    def order(self, trees: List[SearchTree]) -> List[int]:
+        self.__pending.clear()
+        for tree in trees:
+            for node in self.__ancestors(tree):
+                self.__pending[node] += 1
+        return sorted(
+            range(len(trees)),
+            key=lambda i: (trees[i].parent is not self.__position, self.get_trie_key(trees[i])),
+        )
+
+    def done(self, tree: SearchTree):
+        for node in self.__ancestors(tree):
+            self.__pending[node] -= 1
+
+    def get_checkpoint(self, node: SearchTree) -> Optional[Checkpoint]:
+        return self.__checkpoints.get(node)
+
+    def set_checkpoint(self, node: SearchTree, checkpoint: Optional[Checkpoint]):
+        if checkpoint is not None:
+            self.__checkpoints[node] = checkpoint
+
+    def needs_checkpoint(self, node: SearchTree) -> bool:
+        # more than one pending candidate still has to pass through this fork point
+        return (
+            Setting.USE_CHECKPOINT
+            and node not in self.__checkpoints
+            and node not in self.__unrestorable
+            and self.__pending[node] >= 2
+        )
+
+    def discard(self, node: SearchTree):
+        # the checkpoint of node could not be restored
+        self.__checkpoints.pop(node, None)
+        self.__unrestorable.add(node)
+
+    def get_anchor(self, tree: SearchTree) -> Optional[SearchTree]:
+        # closest ancestor of tree that can be reached without replay, None to replay from open
+        for node in self.__ancestors(tree):
+            if node is self.__position or (Setting.USE_CHECKPOINT and node in self.__checkpoints):
+                return node
+        return None
+
+    def __ancestors(self, tree: SearchTree) -> List[SearchTree]:
+        # parent first, root last
+        ancestors = []
+        node = tree.parent
+        while node is not None:
+            ancestors.append(node)
+            node = node.parent
+        return ancestors
+
+    @staticmethod
+    def get_trie_key(tree: SearchTree) -> Tuple[int, ...]:
+        key = []
+        node = tree
+        while node.parent is not None:
+            key.append(node.parent.children.index(node))
+            node = node.parent
+        return tuple(reversed(key))
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from page.element import Element
+from script.operation import CodableOperation, LocatableOperation
+from script.operation_type import OperationType
+from script.script_writer import LocatorWriter
+
+
+class Variation:
+    def __init__(
+        self,
+        variation: Tuple[Element, ...],
+        score: float,
+    ) -> None:
+        self.__variation = variation
+        self.__score = score
+
+    def print(self, indent: int = 0):
+        for enter in self.__variation:
+            print("  " * indent, end="")
+            print(enter)
+
+    @property
+    def score(self) -> float:
+        return self.__score
+
+    @property
+    def variation(self) -> Tuple[Element, ...]:
+        return self.__variation
+
+
+class PageVariation:
+    def __init__(self, variation: Dict[OperationType, Optional[Variation]]):
+        self.__variation = variation
+
+    def get(self, operation_type: OperationType) -> Optional[Variation]:
+        return self.__variation[operation_type]
+
+    @property
+    def score(self) -> float:
+        total = 0
+        for operation_type in [OperationType.ENTER, OperationType.SELECT, OperationType.CLICK]:
+            if self.get(operation_type) is not None:
+                total += self.get(operation_type).score
+        return total
+
+    def to_code(self, codable_steps: List[CodableOperation]):
+        indexes = defaultdict(int)
+        test_script = []
+        for step in codable_steps:
+            if isinstance(step, LocatableOperation):
+                if self.get(step.operation_type) is None:
+                    continue
+                nextStep = self.get(step.operation_type).variation[indexes[step.operation_type]]
+                indexes[step.operation_type] += 1
+                test_script.append(step.to_code(nextStep.get_locator()))
+                LocatorWriter.append(nextStep.get_xpath())
+            else:
+                test_script.append(step.to_code())
+        return test_script
+
+    def print(self, indent: int = 0):
+        for operation_type in [OperationType.ENTER, OperationType.SELECT, OperationType.CLICK]:
+            if self.get(operation_type) is not None:
+                self.get(operation_type).print(indent)
+        print("  " * indent, end="")
+        print(self.score)
+        print("  " * indent, end="")
+        print("------------")
+
+    def easy_print(self):
+        for operation_type in [OperationType.ENTER, OperationType.SELECT, OperationType.CLICK]:
+            if self.get(operation_type) is not None:
+                self.get(operation_type).print()
+
+
+class SearchTree:
+    def __init__(
+        self, score: float, current: Optional[PageVariation], parent: Optional["SearchTree"] = None
+    ):
+        self.__current = current
+        self.__total_score = score
+        self.__parent = parent
+        self.__children = []
+
+    @property
+    def current(self) -> Optional[PageVariation]:
+        return self.__current
+
+    @property
+    def parent(self) -> Optional["SearchTree"]:
+        return self.__parent
+
+    @property
+    def children(self) -> List["SearchTree"]:
+        return self.__children
+
+    @property
+    def total_score(self) -> float:
+        return self.__total_score
+
+    def print(self, depth: int = 0):
+        if self.current is not None:
+            print("  " * depth, end="")
+            print("total: " + str(self.__total_score))
+            self.current.print(depth)
+        for node in self.children:
+            node.print(depth + 1)
+
+
+class State:
+    def __init__(self, search_tree: SearchTree, path: List[PageVariation]):
+        self.__search_tree = search_tree
+        self.__page_variation = path
+
+    @property
+    def search_tree(self) -> SearchTree:
+        return self.__search_tree
+
+    @property
+    def path(self) -> List[PageVariation]:
+        return self.__page_variation
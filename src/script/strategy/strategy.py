@@ -1,6 +1,9 @@
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import List, Type, TypeVar
 
+from script.operation import (CodableOperation, LocatableOperation,
+                              PageTransition, Step)
+from script.strategy.search_tree import PageVariation
 from script.test_case import TestCase
 
 
@@ -8,3 +11,31 @@ class Strategy(metaclass=ABCMeta):
     @abstractmethod
     def to_code(self, test_case: TestCase) -> List[str]:
         pass
+
+    def construct_method_string(self, test_case: TestCase, path: List[PageVariation]) -> str:
+        # the test method of the page variations chosen for each page
+        test_script = []
+        for codable_steps, page_variation in zip(
+            self.filter_by_type_and_split(test_case.steps, CodableOperation), path
+        ):
+            test_script += page_variation.to_code(codable_steps)
+        return """\
+def {}(driver):
+    {}
+""".format(
+            test_case.name, "\n    ".join(test_script)
+        )
+
+    T = TypeVar("T", LocatableOperation, CodableOperation)
+
+    def filter_by_type_and_split(self, steps: List[Step], target_class: Type[T]) -> List[List[T]]:
+        result = []
+        page = []
+        for step in steps:
+            if isinstance(step, PageTransition):
+                result.append(page)
+                page = []
+            elif isinstance(step, target_class):
+                page.append(step)
+        result.append(page)
+        return result
@@ -0,0 +1,21 @@
+from typing import Optional
+
+import Setting
+from page.driver_pool import DriverPool
+from script.strategy.best_first_strategy import BestFirstStrategy
+from script.strategy.greedy_strategy import GreedyStrategy
+from script.strategy.strategy import Strategy
+from script.strategy.transition_matching_strategy import \
+    TransitionMatchingStrategy
+
+
+class StrategyFactory:
+    @classmethod
+    def create(cls, model, driver_pool: Optional[DriverPool] = None) -> Strategy:
+        if Setting.STRATEGY == "beam":
+            return TransitionMatchingStrategy(model, driver_pool)
+        elif Setting.STRATEGY == "best_first":
+            return BestFirstStrategy(model, driver_pool)
+        elif Setting.STRATEGY == "greedy":
+            return GreedyStrategy(model, driver_pool)
+        raise ValueError("unknown strategy: {}".format(Setting.STRATEGY))
@@ -42,12 +42,12 @@ class TestCase:
 
 
 class TestCaseParser:
-    def load_file(self, filepath: str) -> List[TestCase]:
+    def load_file(self, filepath: str, all_testcase: bool = False) -> List[TestCase]:
         test_cases = []
         with open(filepath) as file:
             test_suite = yaml.safe_load(file)
             for name, raw_steps in test_suite.items():
-                if not Setting.ALL_TESTCASE and name not in Setting.TESTCASES:
+                if not (all_testcase or Setting.ALL_TESTCASE) and name not in Setting.TESTCASES:
                     continue
                 steps = []
                 for raw_step in raw_steps:
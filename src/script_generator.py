@@ -2,15 +2,18 @@ import traceback
 from time import time
 
 import Setting
+from generation_worker import GenerationWorker
 from model import Model
+from page.driver_pool import DriverPool
 from script.script_writer import LocatorWriter, ScriptWriter
 from script.strategy.strategy import Strategy
-from script.strategy.transition_matching_strategy import \
-    TransitionMatchingStrategy
+from script.strategy.strategy_factory import StrategyFactory
 from script.test_case import TestCaseParser
+from util.memory_util import MemoryUtil
 
 start = time()
 parser = TestCaseParser()
+driver_pool = None
 try:
     test_cases = parser.load_file(Setting.TESTCASE_DIR + "/" + Setting.TESTCASE_FILE + ".yaml")
     print("loading model...")
@@ -18,15 +21,27 @@ try:
     model_load_time = time() - start
     print("start generation")
     script = ""
-    for test_case in test_cases:
-        print("--------------------")
-        print(test_case.name)
-        print("--------------------")
-        strategy: Strategy = TransitionMatchingStrategy(model)
-        method_string = strategy.to_code(test_case)
-        LocatorWriter.end_testcase()
-        script += "\n"
-        script += method_string
+    if Setting.TESTCASE_PROCESSES > 1:
+        for method_string, locators in GenerationWorker.run(
+            model, test_cases, Setting.TESTCASE_PROCESSES
+        ):
+            LocatorWriter.extend(locators)
+            script += "\n"
+            script += method_string
+    else:
+        if Setting.DRIVER_POOL_SIZE > 0:
+            driver_pool = DriverPool(Setting.DRIVER_POOL_SIZE)
+        for test_case in test_cases:
+            print("--------------------")
+            print(test_case.name)
+            print("--------------------")
+            MemoryUtil.reset_peak_rss()
+            strategy: Strategy = StrategyFactory.create(model, driver_pool)
+            method_string = strategy.to_code(test_case)
+            print("peak RSS: {}[MB]".format(MemoryUtil.get_peak_rss()))
+            LocatorWriter.end_testcase()
+            script += "\n"
+            script += method_string
     writer = ScriptWriter()
     generation_time = time() - start - model_load_time
     writer.write(script, generation_time, model_load_time)
@@ -37,5 +52,7 @@ except Exception as e:
     print(e)
     traceback.print_exc()
 finally:
+    if driver_pool is not None:
+        driver_pool.close()
     elapsed_time = time() - start
     print("elapsed_time:{0}".format(elapsed_time) + "[sec]")
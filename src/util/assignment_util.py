@@ -0,0 +1,137 @@
+import heapq
+from typing import List, Optional, Sequence, Tuple
+
+INF = float("inf")
+
+
+class AssignmentUtil:
+    # margin and bound for also collecting the assignments tied with the k-th best one
+    __TIE_MARGIN = 1e-9
+    __MAX_TIES = 100
+
+    @classmethod
+    def k_best(
+        cls, scores, candidates_list: Sequence[Sequence[int]], k: int
+    ) -> List[Tuple[int, ...]]:
+        # top k duplicate-free assignments (row i takes a column of candidates_list[i]) by the
+        # sum of scores, ranked with Murty's method over the Hungarian method.
+        # ties are ordered like itertools.product(*candidates_list)
+        if len(candidates_list) == 0:
+            return [()]
+        if k <= 0:
+            return []
+        columns = sorted({column for candidates in candidates_list for column in candidates})
+        ranks = [
+            {column: rank for rank, column in enumerate(candidates)}
+            for candidates in candidates_list
+        ]
+        cost = [
+            [-scores[row][column] if column in ranks[row] else INF for column in columns]
+            for row in range(len(candidates_list))
+        ]
+
+        found: List[Tuple[float, Tuple[int, ...], Tuple[int, ...]]] = []
+        queue = []
+        counter = 0
+        first = cls.__solve(cost, [], set())
+        if first is not None:
+            queue.append((first[1], counter, [], set(), first[0]))
+        while queue:
+            total, _, forced, forbidden, assignment = heapq.heappop(queue)
+            if len(found) >= k and total > found[k - 1][0] + cls.__TIE_MARGIN:
+                break
+            if len(found) >= k + cls.__MAX_TIES:
+                break
+            found.append(
+                (
+                    total,
+                    tuple(ranks[row][columns[col]] for row, col in enumerate(assignment)),
+                    tuple(columns[col] for col in assignment),
+                )
+            )
+            # Murty's partition of the remaining solution space of this node
+            forced_rows = {row for row, _ in forced}
+            free_rows = [row for row in range(len(assignment)) if row not in forced_rows]
+            next_forced = list(forced)
+            for row in free_rows:
+                next_forbidden = forbidden | {(row, assignment[row])}
+                solution = cls.__solve(cost, next_forced, next_forbidden)
+                if solution is not None:
+                    counter += 1
+                    heapq.heappush(
+                        queue, (solution[1], counter, list(next_forced), next_forbidden, solution[0])
+                    )
+                next_forced.append((row, assignment[row]))
+
+        found.sort(key=lambda solution: (round(solution[0], 9), solution[1]))
+        return [solution[2] for solution in found[:k]]
+
+    @classmethod
+    def __solve(
+        cls, cost: List[List[float]], forced: List[Tuple[int, int]], forbidden
+    ) -> Optional[Tuple[List[int], float]]:
+        constrained = [list(row) for row in cost]
+        for row, col in forbidden:
+            constrained[row][col] = INF
+        for row, col in forced:
+            for other in range(len(constrained)):
+                if other != row:
+                    constrained[other][col] = INF
+            for other in range(len(constrained[row])):
+                if other != col:
+                    constrained[row][other] = INF
+        assignment = cls.__hungarian(constrained)
+        if assignment is None:
+            return None
+        return assignment, sum(cost[row][col] for row, col in enumerate(assignment))
+
+    @classmethod
+    def __hungarian(cls, cost: List[List[float]]) -> Optional[List[int]]:
+        # shortest augmenting path method for n rows <= m columns, None if infeasible
+        n = len(cost)
+        m = len(cost[0]) if n > 0 else 0
+        if n > m:
+            return None
+        u = [0.0] * (n + 1)
+        v = [0.0] * (m + 1)
+        p = [0] * (m + 1)
+        way = [0] * (m + 1)
+        for i in range(1, n + 1):
+            p[0] = i
+            j0 = 0
+            minv = [INF] * (m + 1)
+            used = [False] * (m + 1)
+            while True:
+                used[j0] = True
+                i0 = p[j0]
+                delta = INF
+                j1 = 0
+                for j in range(1, m + 1):
+                    if not used[j]:
+                        current = cost[i0 - 1][j - 1] - u[i0] - v[j]
+                        if current < minv[j]:
+                            minv[j] = current
+                            way[j] = j0
+                        if minv[j] < delta:
+                            delta = minv[j]
+                            j1 = j
+                if delta == INF:
+                    return None
+                for j in range(m + 1):
+                    if used[j]:
+                        u[p[j]] += delta
+                        v[j] -= delta
+                    else:
+                        minv[j] -= delta
+                j0 = j1
+                if p[j0] == 0:
+                    break
+            while j0 != 0:
+                j1 = way[j0]
+                p[j0] = p[j1]
+                j0 = j1
+        assignment = [0] * n
+        for j in range(1, m + 1):
+            if p[j] != 0:
+                assignment[p[j] - 1] = j - 1
+        return assignment
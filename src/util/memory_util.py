@@ -0,0 +1,24 @@
+import resource
+
+
+class MemoryUtil:
+    @classmethod
+    def reset_peak_rss(cls):
+        # Linux >= 4.0 resets the peak RSS (VmHWM) of the process
+        try:
+            with open("/proc/self/clear_refs", mode="w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+    @classmethod
+    def get_peak_rss(cls) -> int:
+        # [MB] since reset_peak_rss, or since the process started if it could not be reset
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) // 1024
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
@@ -0,0 +1,58 @@
+import glob
+import traceback
+from time import time
+
+import Setting
+from embedding_store import EmbeddingStore
+from model import Model, ModelType
+from page.element_container import ElementContainer
+from page.page_manager import PageManager
+from script.operation import LocatableOperation
+from script.test_case import TestCaseParser
+from util.word_util import WordUtil
+
+start = time()
+try:
+    words = set()
+    parser = TestCaseParser()
+    test_cases = parser.load_file(
+        Setting.TESTCASE_DIR + "/" + Setting.TESTCASE_FILE + ".yaml", all_testcase=True
+    )
+    for test_case in test_cases:
+        for step in test_case.steps:
+            if isinstance(step, LocatableOperation):
+                words.update(WordUtil.filter(step.target.split()))
+    pages = sorted(glob.glob(Setting.PAGE_DIRECTORY + "/" + Setting.TESTCASE_FILE + "/*.html"))
+    element_container = ElementContainer(PageManager(None))
+    for page in pages:
+        with open(page) as f:
+            element_container.extract_element(f.read())
+        for elem in element_container.elems:
+            words.update(elem.attr_words)
+            words.update(elem.text_words)
+    print(
+        "{} words from {} test cases and {} pages".format(len(words), len(test_cases), len(pages))
+    )
+
+    print("loading model...")
+    model = Model(Setting.MODEL, use_pack=False)
+    missing = set()
+    if Setting.MODEL not in [ModelType.FASTTEXT_300, ModelType.FASTTEXT_300_SMALL]:
+        # kept in the pack so that a lookup of them does not load the full model
+        missing = {word for word in words if not model.has_word(word)}
+        words -= missing
+    if len(words) == 0:
+        raise ValueError(
+            "no word of {} has a vector, nothing to write".format(Setting.TESTCASE_FILE)
+        )
+    words = sorted(words)
+    vectors = [model.get_vector(word) for word in words]
+    directory = Model.get_pack_path(Setting.MODEL)
+    print("writing {} vectors to {}".format(len(words), directory))
+    EmbeddingStore.write(directory, words, vectors, missing=sorted(missing))
+except Exception as e:
+    print(e)
+    traceback.print_exc()
+finally:
+    elapsed_time = time() - start
+    print("elapsed_time:{0}".format(elapsed_time) + "[sec]")